@@ -1,23 +1,61 @@
-from fastapi import FastAPI, HTTPException
+import json
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, NamedTuple, Optional
 
-from langchain.memory import ConversationBufferMemory
-from src.components.retrival import retrieve_and_score_query
-from src.components.tools import summarizer_fn, legal_drafting_fn
+from src.components.retrival import (
+    aretrieve_and_score_query,
+    astream_retrieve_and_score_query,
+    aretrieve_and_score_batch,
+)
+from src.components.tools import (
+    asummarizer_fn,
+    alegal_drafting_fn,
+    astream_summarizer_fn,
+    astream_legal_drafting_fn,
+)
+from src.components.embeddings import get_embedding_model
+from src.components import llm
+from src.components.semantic_cache import get_semantic_cache
+from src.components.llm_gateway import LLMQueueTimeout, get_llm_gateway, is_rate_limit_error
+from src.components.session_memory import (
+    SessionState,
+    get_session_store,
+    is_valid_session_id,
+    new_session_id,
+)
+from src.config.config import BATCH_MAX_QUERIES
 
 # Initialize FastAPI
 app = FastAPI(title="Vakki: Legal Research Assistant API")
 
-# Global memory store (per server instance)
-chat_memory = ConversationBufferMemory(return_messages=True)
-retrieved_answer = None
-retrieved_sources = []
+# Conversation state per client, keyed by the X-Session-ID header
+sessions = get_session_store()
+
+
+@app.on_event("startup")
+def load_models():
+    """
+    Build the embedding model, vector store and RAG chain once before serving requests.
+    """
+    llm.startup()
+
+
+@app.on_event("shutdown")
+def release_models():
+    llm.shutdown()
+
 
 # Request models
 class QueryRequest(BaseModel):
     query: str
 
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+
 class SummarizeRequest(BaseModel):
     text: str
 
@@ -25,18 +63,45 @@ class DraftRequest(BaseModel):
     instructions: str
 
 
+def _http_error(e: Exception) -> HTTPException:
+    """
+    Maps LLM saturation to 503 with Retry-After so clients back off; anything else is a 500.
+    """
+    if isinstance(e, LLMQueueTimeout) or is_rate_limit_error(e):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return HTTPException(status_code=500, detail=str(e))
+
+
+class Session(NamedTuple):
+    id: str
+    state: SessionState
+
+
+def get_session(response: Response, x_session_id: Optional[str] = Header(None)) -> Session:
+    """
+    Resolves the caller's session from the X-Session-ID header, starting a new
+    one when the header is missing. The id is echoed back in the response header.
+    """
+    if x_session_id is None:
+        x_session_id = new_session_id()
+    elif not is_valid_session_id(x_session_id):
+        raise HTTPException(status_code=400, detail="Invalid X-Session-ID header.")
+    response.headers["X-Session-ID"] = x_session_id
+    return Session(x_session_id, sessions.get(x_session_id))
+
+
 @app.post("/retrieve")
-def retrieve_answer(req: QueryRequest):
+async def retrieve_answer(req: QueryRequest, session: Session = Depends(get_session)):
     """
     Retrieve a legal answer from the knowledge base.
     """
-    global retrieved_answer, retrieved_sources
     try:
-        answer, similarity, faithfulness, sources = retrieve_and_score_query(
-            req.query, memory=chat_memory
+        answer, similarity, faithfulness, sources = await aretrieve_and_score_query(
+            req.query, memory=session.state.memory
         )
-        retrieved_answer = answer
-        retrieved_sources = sources
+        session.state.retrieved_answer = answer
+        session.state.retrieved_sources = sources
+        await run_in_threadpool(sessions.save, session.id)
 
         return {
             "answer": answer,
@@ -45,11 +110,72 @@ def retrieve_answer(req: QueryRequest):
             "sources": sources
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+
+
+@app.post("/retrieve/batch")
+async def retrieve_batch(req: BatchQueryRequest):
+    """
+    Answer many independent questions in one request. Results come back in
+    order, each with its own `error` field; conversation memory is not used.
+    """
+    if not req.queries:
+        raise HTTPException(status_code=400, detail="No queries provided.")
+    if len(req.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_QUERIES} queries per batch.")
+
+    try:
+        return {"results": await aretrieve_and_score_batch(req.queries)}
+    except Exception as e:
+        raise _http_error(e)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_text(tokens: AsyncIterator[str], key: str) -> AsyncIterator[str]:
+    """
+    Forwards LLM tokens as `token` events, then the full text as a `final` event.
+    """
+    parts = []
+    try:
+        async for token in tokens:
+            parts.append(token)
+            yield _sse("token", {"text": token})
+        yield _sse("final", {key: "".join(parts)})
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+
+
+@app.post("/retrieve/stream")
+async def stream_retrieve_answer(req: QueryRequest, session: Session = Depends(get_session)):
+    """
+    Stream a legal answer as server-sent events: `token` events while the LLM
+    generates, then a `final` event with the answer, scores and sources.
+    """
+    async def events():
+        try:
+            async for event, data in astream_retrieve_and_score_query(req.query, memory=session.state.memory):
+                if event == "token":
+                    yield _sse("token", {"text": data})
+                else:
+                    session.state.retrieved_answer = data["answer"]
+                    session.state.retrieved_sources = data["sources"]
+                    await run_in_threadpool(sessions.save, session.id)
+                    yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"X-Session-ID": session.id},
+    )
 
 
 @app.post("/summarize")
-def summarize_answer(req: SummarizeRequest):
+async def summarize_answer(req: SummarizeRequest):
     """
     Summarize the given answer text.
     """
@@ -57,14 +183,28 @@ def summarize_answer(req: SummarizeRequest):
         raise HTTPException(status_code=400, detail="No text provided for summarization.")
 
     try:
-        summary = summarizer_fn(req.text)
+        summary = await asummarizer_fn(req.text)
         return {"summary": summary}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+
+
+@app.post("/summarize/stream")
+async def stream_summarize_answer(req: SummarizeRequest):
+    """
+    Stream the summary of the given text as server-sent events.
+    """
+    if not req.text.strip():
+        raise HTTPException(status_code=400, detail="No text provided for summarization.")
+
+    return StreamingResponse(
+        _stream_text(astream_summarizer_fn(req.text), "summary"),
+        media_type="text/event-stream",
+    )
 
 
 @app.post("/draft")
-def draft_legal_document(req: DraftRequest):
+async def draft_legal_document(req: DraftRequest):
     """
     Draft a legal document from provided instructions.
     """
@@ -72,19 +212,63 @@ def draft_legal_document(req: DraftRequest):
         raise HTTPException(status_code=400, detail="No drafting instructions provided.")
 
     try:
-        draft = legal_drafting_fn(req.instructions)
+        draft = await alegal_drafting_fn(req.instructions)
         return {"draft": draft}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _http_error(e)
+
+
+@app.post("/draft/stream")
+async def stream_draft_legal_document(req: DraftRequest):
+    """
+    Stream a legal draft as server-sent events.
+    """
+    if not req.instructions.strip():
+        raise HTTPException(status_code=400, detail="No drafting instructions provided.")
+
+    return StreamingResponse(
+        _stream_text(astream_legal_drafting_fn(req.instructions), "draft"),
+        media_type="text/event-stream",
+    )
 
 
 @app.get("/memory")
-def get_conversation_memory():
+def get_conversation_memory(session: Session = Depends(get_session)):
     """
-    Return stored conversation memory messages.
+    Return stored conversation memory messages of the caller's session.
     """
     messages = [
-        {"role": "user" if msg.type == "human" else "assistant", "content": msg.content}
-        for msg in chat_memory.chat_memory.messages
+        {"role": {"human": "user", "system": "system"}.get(msg.type, "assistant"), "content": msg.content}
+        for msg in session.state.memory.chat_memory.messages
     ]
     return {"messages": messages}
+
+
+@app.delete("/memory")
+def clear_conversation_memory(session: Session = Depends(get_session)):
+    """
+    Forget the caller's session.
+    """
+    sessions.delete(session.id)
+    return {"cleared": True}
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """
+    Return hit rates of the semantic answer cache and the embedding cache.
+    """
+    semantic_cache = get_semantic_cache()
+    embedding_cache = getattr(get_embedding_model(), "cache", None)
+    return {
+        "semantic": semantic_cache.stats() if semantic_cache is not None else None,
+        "embedding": embedding_cache.stats() if embedding_cache is not None else None,
+    }
+
+
+@app.get("/llm/stats")
+def get_llm_stats():
+    """
+    Return LLM gateway counters: calls, retries, provider rate limits and queue timeouts.
+    """
+    return get_llm_gateway().stats()
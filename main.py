@@ -10,13 +10,13 @@ import streamlit as st
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
-from langchain.memory import ConversationBufferMemory
-from src.components.retrival import retrieve_and_score_query
-from src.components.tools import summarizer_fn, legal_drafting_fn
+from src.components.session_memory import build_memory
+from src.components.retrival import stream_retrieve_and_score_query
+from src.components.tools import stream_summarizer_fn, stream_legal_drafting_fn
 
 # Initialize memory
 if "chat_memory" not in st.session_state:
-    st.session_state.chat_memory = ConversationBufferMemory(return_messages=True)
+    st.session_state.chat_memory = build_memory()
 
 if "retrieved_answer" not in st.session_state:
     st.session_state.retrieved_answer = ""
@@ -37,7 +37,7 @@ with st.sidebar:
         messages = st.session_state.chat_memory.chat_memory.messages
         if messages:
             for msg in messages:
-                role = "🧑 You" if msg.type == "human" else "🤖 Assistant"
+                role = {"human": "🧑 You", "system": "📝 Summary"}.get(msg.type, "🤖 Assistant")
                 st.markdown(f"**{role}:** {msg.content}")
         else:
             st.info("No memory yet.")
@@ -52,7 +52,7 @@ with st.sidebar:
         story = []
 
         for msg in messages:
-            role = "You" if msg.type == "human" else "Assistant"
+            role = {"human": "You", "system": "Summary"}.get(msg.type, "Assistant")
             content = str(msg.content or "")
 
             # Make links clickable in Assistant responses
@@ -87,6 +87,18 @@ query = st.text_area(
     placeholder="Ask Vakki..."
 )
 
+def render_stream(tokens, placeholder):
+    """
+    Shows tokens in `placeholder` as they arrive and returns the full text.
+    """
+    text = ""
+    for token in tokens:
+        text += token
+        placeholder.markdown(text + "▌")
+    placeholder.markdown(text)
+    return text
+
+
 # Three columns for actions
 col1, col2, col3 = st.columns([1, 1, 1])
 
@@ -101,47 +113,58 @@ with col3:
 
 # ✅ Retrieve Answer
 if retrieve_button and query.strip():
-    with st.spinner("Processing your query..."):
-        try:
-            answer, similarity, faithfulness, sources = retrieve_and_score_query(
-                query, memory=st.session_state.chat_memory
-            )
-            st.session_state.retrieved_answer = answer
-            st.session_state.retrieved_sources = sources
+    try:
+        st.markdown("**🧠 Answer:**")
+        answer_box = st.empty()
+        final = {}
 
-            st.success("✅ Answer Retrieved")
-            st.markdown(f"**🧠 Answer:**\n\n{answer}")
-            st.markdown(f"**🔁 Similarity Score (Query ↔ Answer):** `{similarity:.4f}`")
-            st.markdown(f"**📚 Faithfulness Score (Context ↔ Answer):** `{faithfulness:.4f}`")
+        def answer_tokens():
+            for event, data in stream_retrieve_and_score_query(query, memory=st.session_state.chat_memory):
+                if event == "token":
+                    yield data
+                else:
+                    final.update(data)
 
-        except Exception as e:
-            st.error(f"❌ An error occurred: {e}")
+        with st.spinner("Processing your query..."):
+            render_stream(answer_tokens(), answer_box)
+
+        # Swap the streamed text for the answer with its sources section
+        answer_box.markdown(final["answer"])
+        st.session_state.retrieved_answer = final["answer"]
+        st.session_state.retrieved_sources = final["sources"]
+
+        st.success("✅ Answer Retrieved")
+        st.markdown(f"**🔁 Similarity Score (Query ↔ Answer):** `{final['similarity_score']:.4f}`")
+        st.markdown(f"**📚 Faithfulness Score (Context ↔ Answer):** `{final['faithfulness_score']:.4f}`")
+
+    except Exception as e:
+        st.error(f"❌ An error occurred: {e}")
 
 # ✅ Summarize Retrieved Answer
 elif summarize_button:
     if not st.session_state.retrieved_answer:
         st.warning("❗ No answer available to summarize. Please retrieve an answer first.")
     else:
-        with st.spinner("Summarizing the retrieved answer..."):
-            try:
-                summary = summarizer_fn(st.session_state.retrieved_answer)
-                st.success("📝 Summary Generated")
-                st.markdown(f"**✂️ Summary:**\n\n{summary}")
-            except Exception as e:
-                st.error(f"❌ Failed to summarize: {e}")
+        try:
+            st.markdown("**✂️ Summary:**")
+            with st.spinner("Summarizing the retrieved answer..."):
+                render_stream(stream_summarizer_fn(st.session_state.retrieved_answer), st.empty())
+            st.success("📝 Summary Generated")
+        except Exception as e:
+            st.error(f"❌ Failed to summarize: {e}")
 
 # ✅ Draft Legal Document
 elif draft_button:
     if not query.strip():
         st.warning("❗ Please enter drafting instructions first.")
     else:
-        with st.spinner("Drafting your legal document..."):
-            try:
-                draft = legal_drafting_fn(query)
-                st.success("📄 Draft Generated")
-                st.markdown(f"**🖋 Draft:**\n\n{draft}")
-            except Exception as e:
-                st.error(f"❌ Failed to draft: {e}")
+        try:
+            st.markdown("**🖋 Draft:**")
+            with st.spinner("Drafting your legal document..."):
+                render_stream(stream_legal_drafting_fn(query), st.empty())
+            st.success("📄 Draft Generated")
+        except Exception as e:
+            st.error(f"❌ Failed to draft: {e}")
 
 else:
     st.info("Enter a question above and click 'Retrieve Answer', 'Summarize Answer', or 'Draft Legal Document'.")
@@ -1,50 +1,146 @@
+import os
 import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Header fields (court, date, parties, bench) are looked for in this many leading characters only
+HEADER_WINDOW = 8000
+
+_COURT = re.compile(r'SUPREME\s+COURT\s+OF\s+INDIA', re.IGNORECASE)
+_DATE = re.compile(r'(?:DATE OF JUDGMENT|Judgment Date):\s*(\d{2}[/-]\d{2}[/-]\d{4})')
+_PETITIONER = re.compile(r'PETITIONER:\s*(.*?)\s+Vs\.', re.DOTALL)
+_RESPONDENT = re.compile(r'RESPONDENT:\s*(.*)')
+_BENCH = re.compile(r'(?:BENCH|Judges):\s*(.+)')
+# Blank signature slots in "Judges:" lines: "........................J."
+_BLANK_JUDGE = re.compile(r'[.…]{3,}\s*J\.?')
+_COMMAS = re.compile(r'(?:\s*,)+\s*')
+_SPACES = re.compile(r'\s+')
+
+# Case numbers and citations are tokenized in one scan for the words each must contain;
+# every hit is then parsed where it stands with a bounded pattern:
+#   "Civil Appeal No.3159", "Writ Petition (Civil) No. 12/2004"
+#   "(2004) 8 SCC 173", "[1978] 2 SCR 1", "1996 SCALE (2)312", "JT 1996 (2) 470",
+#   "AIR 1962 SC 1281", "1996 AIR 1234"
+_ANCHOR = re.compile(r'Writ|WRIT|writ|Civil|CIVIL|civil|Criminal|CRIMINAL|criminal|SCC|SCR|SCALE|JT|LLJ|AIR')
+_CASE = re.compile(
+    r'(Writ|Civil|Criminal)\s+(?:[a-z()]+\s+){0,3}?(Petition|Appeal)s?\b[^\d\n]{0,20}?(\d+(?:/\d+)?)',
+    re.IGNORECASE,
+)
+_REPORTER = r'(?:SCC|SCR|SCALE|JT|LLJ)'
+_CITATION = re.compile(
+    rf'[(\[]\d{{4}}[)\]]\s*\d{{1,3}}\s+{_REPORTER}\s+\d{{1,5}}'
+    rf'|\b\d{{4}}\s+{_REPORTER}\s*\(\d{{1,3}}\)\s*\d{{1,5}}'
+    rf'|\b{_REPORTER}\s+\d{{4}}\s*\(\d{{1,3}}\)\s*(?:SC\s+)?\d{{1,5}}'
+    r'|\b\d{4}\s+AIR\s+\d{1,5}'
+    r'|\bAIR\s+\d{4}\s+(?:SC|[A-Z][a-z]+)\s+\d{1,5}'
+)
+# How far a citation reaches before and after its reporter
+_CITATION_BEFORE, _CITATION_AFTER = 16, 32
+
+
+def _references(text):
+    """
+    Case numbers and citations in `text`, each in order of first mention without repeats.
+    """
+    cases, citations = {}, {}
+    end = 0
+    for anchor in _ANCHOR.finditer(text):
+        pos = anchor.start()
+        if pos < end:
+            continue
+        if anchor.group()[0] in 'WCwc':
+            if pos and text[pos - 1].isalnum():
+                continue
+            match = _CASE.match(text, pos)
+            if match is None:
+                continue
+            kind, doc, number = match.groups()
+            cases[f"{kind.title()} {doc.title()} No. {number}"] = None
+        else:
+            match = _CITATION.search(text, max(pos - _CITATION_BEFORE, end), pos + _CITATION_AFTER)
+            if match is None or match.start() > pos:
+                continue
+            citations[_SPACES.sub(' ', match.group())] = None
+        end = match.end()
+    return list(cases), list(citations)
+
 
 def extract_judgment_metadata(text):
     metadata = {}
+    header = text[:HEADER_WINDOW]
 
     # 1. Court Name
-    metadata['Court Name'] = "Supreme Court of India" if "SUPREME COURT OF INDIA" in text.upper() else "Not Found"
+    metadata['Court Name'] = "Supreme Court of India" if _COURT.search(header) else "Not Found"
 
     # 2. Judgment Date and Year
-    date_match = re.search(r'DATE OF JUDGMENT:\s*(\d{2}/\d{2}/\d{4})', text)
+    date_match = _DATE.search(header)
     if date_match:
         metadata['Judgment Date'] = date_match.group(1)
-        metadata['Judgment Year'] = date_match.group(1).split('/')[-1]
+        metadata['Judgment Year'] = date_match.group(1)[-4:]
     else:
         metadata['Judgment Date'] = metadata['Judgment Year'] = "Not Found"
 
     # 3. Case Name
-    pet = re.search(r'PETITIONER:\s*(.*?)\s+Vs\.', text, re.DOTALL)
-    resp = re.search(r'RESPONDENT:\s*(.*?)\n', text)
+    pet = _PETITIONER.search(header)
+    resp = _RESPONDENT.search(header)
     if pet and resp:
         metadata['Case Name'] = f"{pet.group(1).strip()} vs {resp.group(1).strip()}"
     else:
         metadata['Case Name'] = "Not Found"
 
     # 4. Judge Names
-    judges = re.findall(r'BENCH:\s*(.+?)\n', text)
-    unique_judges = list(set(judge.strip() for judge in judges if judge.strip()))
+    judges = (_BLANK_JUDGE.sub('', judge) for judge in _BENCH.findall(header))
+    judges = (_COMMAS.sub(', ', judge).strip(' ,') for judge in judges)
+    unique_judges = list(dict.fromkeys(judge for judge in judges if judge))
     metadata['Judge Name(s)'] = ', '.join(unique_judges) if unique_judges else "Not Found"
 
-    # 5. Case Type & Number (from mentions like Writ Petition No.)
-    case_match = re.findall(r'(Writ|Civil|Criminal)[\s\S]*?(?:Petition|Appeal)[^\d]*(\d+/?\d+)', text, re.IGNORECASE)
-    if case_match:
-        metadata['Case Type and Number'] = [f"{c[0]} Petition No. {c[1]}" for c in case_match]
-    else:
-        metadata['Case Type and Number'] = []
-
-    # 6. Referred Citations (like "JT 1996 (2) 470", "1996 SCALE (2)312")
-    citations = re.findall(r'\b(?:JT|SCC|AIR|SCR|SCALE|LLJ)[^\n]+', text)
-    metadata['Referred Citations'] = list(set(c.strip() for c in citations))
+    # 5. Case Type & Number and 6. Referred Citations (like "JT 1996 (2) 470", "1996 SCALE (2)312")
+    metadata['Case Type and Number'], metadata['Referred Citations'] = _references(text)
 
     return metadata
 
 
-# Usage Example
-# with open('16050.txt', 'r', encoding='utf-8') as file:
-#     text = file.read()
-text=(""" IN THE SUPREME COURT OF INDIA
+def extract_file_metadata(path):
+    """
+    Metadata of one judgment file, with its path under 'File'.
+    """
+    with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+        return {'File': path, **extract_judgment_metadata(file.read())}
+
+
+def extract_directory_metadata(directory, workers=None, chunksize=16):
+    """
+    Metadata of every .txt judgment under `directory`, in path order.
+
+    Files are parsed by a pool of `workers` processes (default: one per CPU),
+    `chunksize` files per task; `workers=1` parses them in this process.
+    """
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith('.txt')
+    )
+    if workers == 1 or len(paths) < 2:
+        return [extract_file_metadata(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract_file_metadata, paths, chunksize=chunksize))
+
+
+def _print_metadata(metadata):
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            print(f"{key}:")
+            for item in value:
+                print(f"  - {item}")
+        else:
+            print(f"{key}: {value}")
+
+
+# Sample judgment for the example and benchmark below
+SAMPLE_JUDGMENT = (""" IN THE SUPREME COURT OF INDIA
 CIVIL APPELLATE JURISDICTION
 CIVIL APPEAL No.3159 OF 2004
 COMMISSIONER OF CENTRAL EXCISE, 
@@ -1321,13 +1417,32 @@ arising in all the three questions that have been referred for our opinion.
 NEW DELHI
 MAY 11, 2018.""")
 
-metadata = extract_judgment_metadata(text)
+if __name__ == "__main__":
+    # Usage: python metadata.py [directory of judgments]
+    if len(sys.argv) > 1:
+        for metadata in extract_directory_metadata(sys.argv[1]):
+            _print_metadata(metadata)
+            print()
+        sys.exit()
 
-# Display metadata
-for key, value in metadata.items():
-    if isinstance(value, list):
-        print(f"{key}:")
-        for item in value:
-            print(f"  - {item}")
-    else:
-        print(f"{key}: {value}")
+    _print_metadata(extract_judgment_metadata(SAMPLE_JUDGMENT))
+
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        extract_judgment_metadata(SAMPLE_JUDGMENT)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"\nSingle judgment ({len(SAMPLE_JUDGMENT) / 1000:.0f}k chars): {elapsed * 1000:.2f} ms "
+          f"({len(SAMPLE_JUDGMENT) / elapsed / 1e6:.1f} MB/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = 1000
+        for i in range(files):
+            with open(os.path.join(tmp, f"{i:04d}.txt"), 'w', encoding='utf-8') as file:
+                file.write(SAMPLE_JUDGMENT)
+        for workers in (1, None):
+            start = time.perf_counter()
+            extract_directory_metadata(tmp, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"Directory of {files} judgments, {workers or os.cpu_count()} process(es): "
+                  f"{elapsed:.2f}s ({files / elapsed:.0f} judgments/s)")
@@ -0,0 +1,294 @@
+import os
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.components.scoring import normalize
+
+logger = get_logger(__name__)
+
+
+class IVFIndex:
+    """
+    Inverted-file index for cosine search over unit-length float32 vectors.
+
+    Vectors are clustered with spherical k-means into `nlist` lists. A query
+    scans only the `nprobe` lists whose centroids are closest, so `nprobe`
+    trades recall for latency at search time without rebuilding anything.
+
+    The index stores row numbers, not vectors: searches score candidates
+    against the backing matrix (usually a memory-mapped file) passed in.
+    """
+
+    def __init__(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        train_size: int = 65536,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0  # corpus size nlist was chosen for
+        # Appended batches are kept as parts and merged on first use, so a
+        # long ingestion doesn't re-copy the whole list on every batch
+        self._row_parts = [np.zeros(0, dtype=np.int64)]
+        self._assign_parts = [np.zeros(0, dtype=np.int32)]
+        self._order = None
+        self._bounds = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._row_parts)
+
+    def _merged(self):
+        if len(self._row_parts) > 1:
+            self._row_parts = [np.concatenate(self._row_parts)]
+            self._assign_parts = [np.concatenate(self._assign_parts)]
+        return self._row_parts[0], self._assign_parts[0]
+
+    # ------------------------------------------------------------------ #
+    # Build
+    # ------------------------------------------------------------------ #
+    def train(self, vectors) -> None:
+        """
+        Learns the list centroids from (a sample of) `vectors`.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            raise CustomException("Cannot train an IVF index on zero vectors.")
+
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.train_size:
+            sample = vectors[np.sort(rng.choice(len(vectors), self.train_size, replace=False))]
+        else:
+            sample = vectors
+        sample = normalize(sample)
+
+        nlist = self.nlist or max(1, int(4 * np.sqrt(len(vectors))))
+        nlist = min(nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+
+        for _ in range(self.iterations):
+            assign = self._nearest_list(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+
+        self.centroids = centroids
+        self.nlist = nlist
+        self.trained_rows = len(vectors)
+        logger.info(f"Trained IVF index with {nlist} lists on {len(sample)} vectors.")
+
+    @staticmethod
+    def _nearest_list(vectors: np.ndarray, centroids: np.ndarray, block: int = 16384) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block):
+            out[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+        return out
+
+    def add(self, vectors, rows: Sequence[int]) -> None:
+        """
+        Assigns `vectors` (stored at `rows` of the backing matrix) to their nearest lists.
+        """
+        if not self.is_trained:
+            raise CustomException("IVF index must be trained before adding vectors.")
+        vectors = normalize(vectors).reshape(-1, self.centroids.shape[1])
+        assign = self._nearest_list(vectors, self.centroids)
+        self._row_parts.append(np.asarray(rows, dtype=np.int64))
+        self._assign_parts.append(assign)
+        self._order = self._bounds = None
+
+    @classmethod
+    def build(cls, vectors, rows: Optional[Sequence[int]] = None, **kwargs) -> "IVFIndex":
+        """
+        Trains an index on `vectors` and adds all of them.
+        """
+        index = cls(**kwargs)
+        index.train(vectors)
+        rows = np.arange(len(vectors)) if rows is None else rows
+        for start in range(0, len(vectors), 65536):
+            index.add(np.asarray(vectors[start:start + 65536]), rows[start:start + 65536])
+        return index
+
+    def _finalize(self) -> None:
+        rows, assign = self._merged()
+        order = np.argsort(assign, kind="stable")
+        self._order = rows[order]
+        self._bounds = np.searchsorted(assign[order], np.arange(self.nlist + 1))
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def candidates(
+        self,
+        query,
+        nprobe: Optional[int] = None,
+        alive: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Returns the sorted rows stored in the `nprobe` lists nearest to `query`.
+
+        Args:
+            nprobe: Lists to scan; defaults to the index's own setting
+            alive: Optional boolean mask over rows; False rows are skipped
+        """
+        if self._order is None:
+            self._finalize()
+
+        query = normalize(query).reshape(-1)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([self._order[self._bounds[c]:self._bounds[c + 1]] for c in probe])
+        if alive is not None:
+            rows = rows[alive[rows]]
+        # Reading sorted rows keeps memory-mapped access mostly sequential
+        rows.sort()
+        return rows
+
+    def search(
+        self,
+        vectors,
+        query,
+        k: int = 5,
+        nprobe: Optional[int] = None,
+        alive: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the best `k` (rows, scores) for `query`, scored against `vectors`,
+        the backing matrix of unit-length rows the index was built over.
+        """
+        query = normalize(query).reshape(-1)
+        candidates = self.candidates(query, nprobe=nprobe, alive=alive)
+        if len(candidates) == 0:
+            return candidates, np.zeros(0, dtype=np.float32)
+
+        scores = np.asarray(vectors[candidates]) @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def save(self, path: str) -> None:
+        if not self.is_trained:
+            raise CustomException("Cannot save an untrained IVF index.")
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            rows=self._merged()[0],
+            assign=self._merged()[1],
+            params=np.array([self.nlist, self.nprobe, self.trained_rows], dtype=np.int64),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as data:
+            params = data["params"].tolist()
+            index = cls(nlist=params[0], nprobe=params[1])
+            index.centroids = data["centroids"]
+            index._row_parts = [data["rows"]]
+            index._assign_parts = [data["assign"]]
+            # Indexes saved before trained_rows was stored count as trained on all their rows
+            index.trained_rows = params[2] if len(params) > 2 else len(data["rows"])
+        return index
+
+
+def exact_search(vectors, query, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Brute-force cosine search over unit-length rows; the ground truth for recall.
+    """
+    scores = np.asarray(vectors @ normalize(query).reshape(-1))
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+
+def recall_latency_report(
+    vectors,
+    queries,
+    k: int = 5,
+    nprobe_values: Sequence[int] = (1, 2, 4, 8, 16, 32, 64),
+    index: Optional[IVFIndex] = None,
+) -> List[dict]:
+    """
+    Measures recall@k and per-query latency of the IVF index at each nprobe
+    against exact search, to pick a production operating point.
+    `vectors` must already be unit-length rows.
+    """
+    index = index or IVFIndex.build(vectors)
+
+    def timed(search):
+        results, timings = [], []
+        for q in queries:
+            start = time.perf_counter()
+            rows, _ = search(q)
+            timings.append((time.perf_counter() - start) * 1000)
+            results.append(set(rows.tolist()))
+        return results, np.array(timings)
+
+    truth, exact_ms = timed(lambda q: exact_search(vectors, q, k))
+    report = [{
+        "mode": "exact",
+        "nprobe": None,
+        "recall_at_k": 1.0,
+        "p50_ms": float(np.percentile(exact_ms, 50)),
+        "p95_ms": float(np.percentile(exact_ms, 95)),
+    }]
+
+    for nprobe in nprobe_values:
+        if nprobe > index.nlist:
+            break
+        found, ivf_ms = timed(lambda q: index.search(vectors, q, k, nprobe=nprobe))
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        report.append({
+            "mode": "ivf",
+            "nprobe": nprobe,
+            "recall_at_k": float(recall),
+            "p50_ms": float(np.percentile(ivf_ms, 50)),
+            "p95_ms": float(np.percentile(ivf_ms, 95)),
+        })
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.components.ann_index [path/to/vectors.f32] [dimension]
+    rng = np.random.default_rng(0)
+    if len(sys.argv) > 1:
+        dim = int(sys.argv[2]) if len(sys.argv) > 2 else 384
+        data = np.memmap(sys.argv[1], dtype=np.float32, mode="r").reshape(-1, dim)
+    else:
+        # Clustered synthetic data roughly shaped like sentence embeddings
+        centers = normalize(rng.normal(size=(500, 384)))
+        data = normalize(centers[rng.integers(0, 500, 200_000)] + 0.6 * rng.normal(size=(200_000, 384)) / np.sqrt(384))
+
+    sample = rng.choice(len(data), size=min(200, len(data)), replace=False)
+    query_set = normalize(np.asarray(data[sample]) + 0.05 * rng.normal(size=(len(sample), data.shape[1])))
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(data)
+    print(f"Built IVF index: {len(data)} vectors, {ivf.nlist} lists in {time.perf_counter() - start:.1f}s")
+    print(f"{'mode':<6}{'nprobe':>8}{'recall@5':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in recall_latency_report(data, query_set, k=5, index=ivf):
+        print(f"{row['mode']:<6}{str(row['nprobe'] or '-'):>8}{row['recall_at_k']:>10.3f}"
+              f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}")
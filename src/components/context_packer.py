@@ -0,0 +1,164 @@
+from typing import List, NamedTuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.common.logger import get_logger
+from src.components.scoring import normalize
+from src.components.tokens import count_tokens, truncate_to_tokens
+
+logger = get_logger(__name__)
+
+
+class PackedContext(NamedTuple):
+    docs: List[Document]  # context blocks, most relevant first
+    vectors: List[List[float]]  # one vector per block
+    chunks_in: int
+    tokens_in: int  # tokens of the retrieved chunks as they came in
+    tokens_out: int  # tokens of the packed blocks
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+def _overlap(left: str, right: str, min_overlap: int, max_overlap: int) -> int:
+    """
+    Length of the longest suffix of `left` that is also a prefix of `right`
+    (at least `min_overlap` characters), or 0.
+    """
+    for size in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _numbers(label) -> List[int]:
+    """
+    Numbers in a page or paragraph label: 3 -> [3], "4-6, 9" -> [4, 5, 6, 9], "N/A" -> [].
+    """
+    numbers = []
+    for part in str(label).split(","):
+        bounds = [bound.strip() for bound in part.split("-")]
+        if len(bounds) <= 2 and all(bound.isdigit() for bound in bounds):
+            numbers.extend(range(int(bounds[0]), int(bounds[-1]) + 1))
+    return numbers
+
+
+def _merge_labels(left, right):
+    """
+    Union of two page or paragraph labels as runs: (3, 4) -> "3-4", ("4-5", "8") -> "4-5, 8".
+    A label without numbers ("N/A", "") gives way to the other; a single page stays as it was.
+    """
+    numbers = sorted(set(_numbers(left) + _numbers(right)))
+    if not numbers:
+        return left if left not in (None, "") else right
+    if len(numbers) == 1:
+        return left if _numbers(left) else right
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return ", ".join(str(low) if low == high else f"{low}-{high}" for low, high in runs)
+
+
+class _Block:
+    __slots__ = ("text", "metadata", "rank", "vectors")
+
+    def __init__(self, doc: Document, rank: int, vector):
+        self.text = doc.page_content.strip()
+        self.metadata = dict(doc.metadata)
+        self.rank = rank
+        self.vectors = [vector]
+
+    def absorb(self, other: "_Block", text: str) -> None:
+        self.text = text
+        self.rank = min(self.rank, other.rank)
+        self.vectors.extend(other.vectors)
+        for key in ("page", "paragraphs"):
+            if key in self.metadata or key in other.metadata:
+                self.metadata[key] = _merge_labels(self.metadata.get(key), other.metadata.get(key))
+
+
+def _merge_overlapping(blocks: List[_Block], min_overlap: int, max_overlap: int) -> List[_Block]:
+    """
+    Joins blocks of the same source whose text overlaps end-to-start (the
+    splitter's chunk overlap) or where one contains the other.
+    """
+    merged = True
+    while merged:
+        merged = False
+        for i, a in enumerate(blocks):
+            for j, b in enumerate(blocks):
+                if i == j or a.metadata.get("source") != b.metadata.get("source"):
+                    continue
+                if b.text in a.text:
+                    text = a.text
+                else:
+                    size = _overlap(a.text, b.text, min_overlap, max_overlap)
+                    if not size:
+                        continue
+                    text = a.text + b.text[size:]
+                a.absorb(b, text)
+                del blocks[j]
+                merged = True
+                break
+            if merged:
+                break
+    return blocks
+
+
+def pack_context(
+    docs: List[Document],
+    vectors: List[List[float]],
+    max_tokens: int = 3000,
+    dedup_threshold: float = 0.95,
+    min_overlap: int = 20,
+    max_overlap: int = 400,
+) -> PackedContext:
+    """
+    Turns retrieved chunks (best first, with their stored vectors) into a
+    compact LLM context.
+
+    1. Chunks of the same source that overlap end-to-start, as neighbouring
+       chunks from the splitter do, are merged into one block, so the
+       overlap is sent once. The block's page and paragraphs span both.
+    2. Blocks whose vector is within `dedup_threshold` cosine similarity of
+       a more relevant block are dropped as near-duplicates.
+    3. Blocks are added by relevance (best member's rank) until `max_tokens`;
+       the block that crosses the budget is cut to fit.
+
+    Each block's vector is the normalized mean of its members', so answer
+    scoring keeps one vector per context block.
+    """
+    tokens_in = sum(count_tokens(doc.page_content) for doc in docs)
+    blocks = [_Block(doc, rank, vector) for rank, (doc, vector) in enumerate(zip(docs, vectors))]
+    blocks = _merge_overlapping(blocks, min_overlap, max_overlap)
+    blocks.sort(key=lambda block: block.rank)
+
+    kept: List[_Block] = []
+    kept_vectors: List[np.ndarray] = []
+    for block in blocks:
+        vector = normalize(np.mean(np.asarray(block.vectors, dtype=np.float32), axis=0))
+        if kept_vectors and float(np.max(np.stack(kept_vectors) @ vector)) >= dedup_threshold:
+            continue
+        kept.append(block)
+        kept_vectors.append(vector)
+
+    packed_docs, packed_vectors, tokens_out = [], [], 0
+    for block, vector in zip(kept, kept_vectors):
+        tokens = count_tokens(block.text)
+        remaining = max_tokens - tokens_out
+        if remaining <= 0:
+            break
+        text = block.text
+        if tokens > remaining:
+            text = truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+        packed_docs.append(Document(page_content=text, metadata=block.metadata))
+        packed_vectors.append(vector.tolist())
+        tokens_out += tokens
+
+    return PackedContext(packed_docs, packed_vectors, len(docs), tokens_in, tokens_out)
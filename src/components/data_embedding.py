@@ -1,13 +1,15 @@
-from typing import List, Tuple
-from src.config.config import filepath
+from typing import Iterable, Iterator, List, Tuple
+from src.config.config import filepath, CHUNKER
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
 from src.components.data_ingestion import load_documents_from_text_file, filter_to_minimal_docs
 from langchain_community.document_loaders import TextLoader
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter, TextSplitter
+from src.components.embeddings import get_embedding_model
+from src.components.judgment_splitter import JudgmentSplitter
 
 
 
@@ -15,25 +17,42 @@ from langchain_community.embeddings import OpenAIEmbeddings
 
 logger = get_logger(__name__)
 
-def prepare_text_chunks_with_embeddings(minimal_docs: List[Document]) -> Tuple[List[Document], HuggingFaceEmbeddings]:
+def get_text_splitter() -> TextSplitter:
     """
-    Prepares the text chunks from minimal documents and loads HuggingFace embeddings.
+    Returns the splitter used for every chunking path, so batch and streaming ingestion agree.
+    """
+    if CHUNKER == "judgment":
+        return JudgmentSplitter(chunk_size=1000, chunk_overlap=200)
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+    )
+
+
+def iter_text_chunks(documents: Iterable[Document]) -> Iterator[Document]:
+    """
+    Lazily splits a stream of documents into chunks, one document at a time.
+    """
+    text_splitter = get_text_splitter()
+    for doc in documents:
+        yield from text_splitter.split_documents([doc])
+
+
+def prepare_text_chunks_with_embeddings(minimal_docs: List[Document]) -> Tuple[List[Document], Embeddings]:
+    """
+    Prepares the text chunks from minimal documents and returns the shared embedding model.
     
     Returns:
         texts_chunk: List of chunked Document objects
-        embedding: HuggingFaceEmbeddings object for vector storage or similarity
+        embedding: Shared (cached) embeddings object for vector storage or similarity
     """
     try:
         # 1. Split text into manageable chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-        )
+        text_splitter = get_text_splitter()
         texts_chunk = text_splitter.split_documents(minimal_docs)
 
-        # 2. Load OpenAI Embedding model
-        model_name = "text-embedding-3-small"
-        embedding = OpenAIEmbeddings(model=model_name)
+        # 2. Reuse the shared embedding model (384-d, matches the Pinecone index)
+        embedding = get_embedding_model()
 
         logger.info(f"Successfully prepared {len(texts_chunk)} text chunks with embeddings.")
         return texts_chunk, embedding
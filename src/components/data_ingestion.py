@@ -4,8 +4,8 @@ from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
 from langchain_community.document_loaders import TextLoader
 
-from langchain.schema import Document
-from typing import List
+from langchain_core.documents import Document
+from typing import Iterator, List
 from src.config.config import filepath
 
 
@@ -61,4 +61,35 @@ def load_documents_from_directory(directory: str, encoding: str = "utf-8") -> Li
     return filter_to_minimal_docs(docs)
 
 
+def iter_text_segments(
+    filepath: str,
+    encoding: str = "utf-8",
+    segment_chars: int = 200_000,
+) -> Iterator[Document]:
+    """
+    Streams a large text file as Documents of roughly `segment_chars` characters.
+
+    Segments end on a blank line (or newline) where possible so chunks don't
+    straddle them, and only one segment is held in memory at a time.
+    """
+    if not os.path.exists(filepath):
+        raise CustomException(f"File does not exist: {filepath}")
+
+    carry = ""
+    with open(filepath, "r", encoding=encoding) as f:
+        while True:
+            block = f.read(segment_chars)
+            if not block:
+                break
+            text = carry + block
+            cut = text.rfind("\n\n")
+            if cut <= 0:
+                cut = text.rfind("\n")
+            if cut <= 0:
+                cut = len(text)
+            carry = text[cut:]
+            if text[:cut].strip():
+                yield Document(page_content=text[:cut], metadata={"source": filepath})
 
+    if carry.strip():
+        yield Document(page_content=carry, metadata={"source": filepath})
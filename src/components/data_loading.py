@@ -2,50 +2,175 @@ import os
 from dotenv import load_dotenv
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
-from src.components.data_ingestion import load_documents_from_text_file, filter_to_minimal_docs
-from src.components.data_embedding import prepare_text_chunks_with_embeddings
-from src.components.vector import store_documents_in_pinecone
-from src.config.config import filepath
-import sys
-import os
-from langchain_community.embeddings import OpenAIEmbeddings
+from src.components.data_ingestion import iter_text_segments
+from src.components.data_embedding import iter_text_chunks
+from src.components.embeddings import get_embedding_model
+from src.components.embedding_workers import EmbeddingWorkerPool
+from src.components.lexical_index import BM25Index, load_lexical_index
+from src.components.manifest import IndexManifest, hash_file, with_chunk_ids, bump_index_version
+from src.components.streaming import batched, threaded
+from src.components.vector import open_vector_store, upsert_embeddings, delete_from_store
+from src.config.config import (
+    filepath, EMBED_BATCH_SIZE, EMBED_WORKERS, MANIFEST_DIR, CHUNKER, LEXICAL_COMPACT_RATIO,
+    EMBEDDING_MODEL_NAME,
+)
+from typing import List, Tuple
 
 
 logger = get_logger(__name__)
 
-def run_llmops_data_pipeline(file_path: str, index_name: str = "test-txt-chatbot1"):
+def list_source_files(path: str) -> List[str]:
+    """
+    Returns `path` itself, or every .txt file under it when it's a directory.
     """
-    Runs the complete LLMOps pipeline from data ingestion to Pinecone vector storage.
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if name.endswith(".txt")
+        )
+    return [path]
+
+
+def _index_file(
+    source: str,
+    file_hash: str,
+    docsearch,
+    lexical_index: BM25Index,
+    manifest: IndexManifest,
+    embed_batches,
+    batch_size: int,
+    queue_size: int,
+) -> Tuple[int, int]:
+    """
+    Streams one file through the pipeline, embedding only chunks the manifest doesn't have.
+
+    Returns:
+        (chunks upserted, stale chunks deleted)
+    """
+    old_ids = set(manifest.chunk_ids(source))
+    chunk_ids: List[str] = []
+
+    def new_chunks():
+        for doc, chunk_id in with_chunk_ids(iter_text_chunks(iter_text_segments(source))):
+            chunk_ids.append(chunk_id)
+            if chunk_id not in old_ids:
+                yield doc, chunk_id
+
+    # Stage 1 + 2 (read, split) -> stage 3 (embed) -> stage 4 (upsert, this thread)
+    chunk_batches = threaded(batched(new_chunks(), batch_size), maxsize=queue_size)
+    upserted = 0
+    for batch, vectors in threaded(embed_batches(chunk_batches), maxsize=queue_size):
+        ids = upsert_embeddings(docsearch, [doc for doc, _ in batch], vectors, ids=[i for _, i in batch])
+        lexical_index.add(ids, [doc.page_content for doc, _ in batch])
+        upserted += len(batch)
+        logger.info(f"✅ Stored batch of {len(batch)} chunks from {source} ({upserted} so far).")
+
+    # Only drop old chunks and record the file once its new chunks are stored
+    stale = sorted(old_ids.difference(chunk_ids))
+    if stale:
+        delete_from_store(docsearch, stale)
+        lexical_index.delete(stale)
+    manifest.update(source, file_hash, chunk_ids)
+    manifest.save()
+    return upserted, len(stale)
+
+
+def run_llmops_data_pipeline(
+    file_path: str,
+    index_name: str = "test-txt-chatbot1",
+    batch_size: int = EMBED_BATCH_SIZE,
+    queue_size: int = 4,
+    workers: int = EMBED_WORKERS,
+    full_refresh: bool = False,
+) -> int:
     """
+    Runs the LLMOps pipeline from data ingestion to vector storage (Pinecone or local).
+
+    `file_path` may be one text file or a directory of them. Each file is
+    streamed through read -> split -> embed -> upsert in batches of
+    `batch_size` chunks. Each stage runs on its own thread and hands batches to
+    the next over a queue holding at most `queue_size` of them, so a slow stage
+    throttles the ones before it and peak memory doesn't grow with corpus size.
+    With `workers` > 1, batches are embedded by a pool of model-resident processes.
+
+    Re-runs are incremental: a manifest of file and chunk hashes (MANIFEST_DIR)
+    lets unchanged files be skipped, unchanged chunks keep their deterministic
+    ids, and chunks that disappeared are deleted. The BM25 index used for
+    hybrid retrieval is updated alongside the vector store, and compacted once
+    more than LEXICAL_COMPACT_RATIO of its rows are deleted. `full_refresh`
+    ignores the manifest and re-embeds everything.
+
+    Returns:
+        Number of chunks upserted
+    """
+    total_uploaded = 0
+    pool = None
     try:
         logger.info("🚀 Starting the LLMOps data pipeline...")
+        docsearch = open_vector_store(index_name)
+        lexical_index = load_lexical_index(index_name)
+        manifest_path = os.path.join(MANIFEST_DIR, f"{index_name}.json")
+        manifest = IndexManifest(manifest_path) if full_refresh else IndexManifest.load(manifest_path)
 
-        # Step 1: Load and filter documents
-        docs = load_documents_from_text_file(file_path)
-        if not docs:
-            raise CustomException("No documents loaded. Please check your input file.")
+        def texts_of(batch):
+            return [doc.page_content for doc, _ in batch]
 
-        minimal_docs = filter_to_minimal_docs(docs)
+        if workers > 1:
+            pool = EmbeddingWorkerPool(workers=workers, max_pending=workers + queue_size).start()
 
-        # Step 2: Text chunking and embedding
-        texts_chunk, embedding = prepare_text_chunks_with_embeddings(minimal_docs)
-        if not texts_chunk or embedding is None:
-            raise CustomException("Text chunking or embedding failed.")
+            def embed_batches(batches):
+                return pool.imap(batches, texts=texts_of)
+        else:
+            embedding = get_embedding_model()
 
-        # Step 3: Store in Pinecone
-        docsearch = store_documents_in_pinecone(
-            texts_chunk=texts_chunk,
-            embedding=embedding,
-            index_name=index_name
-        )
+            def embed_batches(batches):
+                return ((batch, embedding.embed_documents(texts_of(batch))) for batch in batches)
 
-        if docsearch:
-            logger.info("✅ Pipeline completed and documents stored in Pinecone.")
-        else:
-            logger.warning("⚠️ Pipeline completed but failed to store documents in Pinecone.")
+        sources = list_source_files(file_path)
+        total_deleted = skipped = 0
+        for source in sources:
+            # Switching CHUNKER or the embedding model re-indexes files that are otherwise unchanged
+            file_hash = f"{hash_file(source)}:{CHUNKER}:{EMBEDDING_MODEL_NAME}"
+            if manifest.is_unchanged(source, file_hash):
+                skipped += 1
+                continue
+            upserted, deleted = _index_file(
+                source, file_hash, docsearch, lexical_index, manifest, embed_batches, batch_size, queue_size
+            )
+            total_uploaded += upserted
+            total_deleted += deleted
+
+        # Files indexed before but no longer present under a directory input
+        if os.path.isdir(file_path):
+            root = os.path.join(file_path, "")
+            for source in manifest.sources():
+                if source.startswith(root) and source not in sources:
+                    stale = manifest.remove(source)
+                    delete_from_store(docsearch, stale)
+                    lexical_index.delete(stale)
+                    total_deleted += len(stale)
+            manifest.save()
+
+        if total_uploaded or total_deleted:
+            bump_index_version(index_name)
+        if lexical_index.deleted_ratio > LEXICAL_COMPACT_RATIO:
+            lexical_index.compact()
+
+        logger.info(
+            f"✅ Pipeline completed: {total_uploaded} chunks upserted, {total_deleted} deleted, "
+            f"{skipped} unchanged file(s) skipped."
+        )
 
     except Exception as e:
         logger.error(f"❌ Pipeline failed with error: {e}")
+        raise CustomException(f"Data pipeline failed after {total_uploaded} chunks: {e}")
+    finally:
+        if pool is not None:
+            pool.close()
+
+    return total_uploaded
 
 
 #  Add this to allow direct execution
@@ -0,0 +1,113 @@
+import multiprocessing as mp
+import os
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.config.config import EMBEDDING_MODEL_NAME, EMBED_WORKERS
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Set in each worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int) -> None:
+    global _worker_model
+    # Split the cores between workers instead of letting each torch grab all of them
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from src.components.embeddings import get_embedding_model
+    _worker_model = get_embedding_model(model_name)
+
+
+def _embed(texts: List[str]) -> List[List[float]]:
+    return _worker_model.embed_documents(texts)
+
+
+class EmbeddingWorkerPool:
+    """
+    Pool of processes that each keep a sentence-transformers model resident and
+    embed batches in parallel. Results come back in submission order.
+
+    Usage:
+        with EmbeddingWorkerPool(workers=8) as pool:
+            for batch, vectors in pool.imap(batches, texts=lambda b: [d.page_content for d in b]):
+                ...
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        workers: int = EMBED_WORKERS,
+        max_pending: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        # Bounds batches in flight so a slow consumer throttles the producer
+        self.max_pending = max_pending or 2 * self.workers
+        self._pool = None
+
+    def start(self) -> "EmbeddingWorkerPool":
+        if self._pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # spawn: torch and forked parents don't mix, and it matches Windows behaviour
+            ctx = mp.get_context("spawn")
+            self._pool = ctx.Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, torch_threads),
+            )
+            logger.info(f"Started {self.workers} embedding workers for '{self.model_name}'.")
+        return self
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "EmbeddingWorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is not None and self._pool is not None:
+            self._pool.terminate()
+        self.close()
+
+    def imap(
+        self,
+        items: Iterable[T],
+        texts: Callable[[T], List[str]] = lambda item: item,
+    ) -> Iterator[Tuple[T, List[List[float]]]]:
+        """
+        Embeds `texts(item)` for every item in parallel and yields (item, vectors) in order.
+        """
+        self.start()
+        pending = deque()
+        try:
+            for item in items:
+                pending.append((item, self._pool.apply_async(_embed, (texts(item),))))
+                if len(pending) >= self.max_pending:
+                    item, result = pending.popleft()
+                    yield item, result.get()
+            while pending:
+                item, result = pending.popleft()
+                yield item, result.get()
+        except Exception as e:
+            logger.error(f"❌ Embedding worker failed: {e}")
+            raise CustomException("Embedding worker failed", e)
+
+    def embed_documents(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """
+        Embeds `texts` across the workers, preserving order.
+        """
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        vectors = []
+        for _, batch_vectors in self.imap(batches):
+            vectors.extend(batch_vectors)
+        return vectors
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.components.embedding_cache import CachedEmbeddings, get_embedding_cache
+from src.config.config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBED_EXECUTOR_THREADS,
+)
+
+logger = get_logger(__name__)
+
+# One loaded model per name for the whole process
+_models: Dict[str, Embeddings] = {}
+_lock = threading.Lock()
+# Async callers run CPU-bound model calls here instead of on the event loop
+_executor = ThreadPoolExecutor(max_workers=EMBED_EXECUTOR_THREADS, thread_name_prefix="embed")
+
+
+def get_embedding_model(model_name: str = EMBEDDING_MODEL_NAME) -> Embeddings:
+    """
+    Returns the process-wide embedding model for `model_name`, loading it on first use.
+    When EMBEDDING_CACHE_PATH is set the model sits behind the on-disk embedding cache.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        model = _models.get(model_name)
+        if model is None:
+            try:
+                logger.info(f"Loading embedding model '{model_name}'...")
+                model = HuggingFaceEmbeddings(model_name=model_name)
+                if EMBEDDING_CACHE_PATH:
+                    cache = get_embedding_cache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_MB * 1024 * 1024)
+                    model = CachedEmbeddings(model, model_name, cache)
+                _models[model_name] = model
+                logger.info(f"✅ Embedding model '{model_name}' loaded.")
+            except Exception as e:
+                logger.error(f"❌ Failed to load embedding model '{model_name}': {e}")
+                raise CustomException(f"Failed to load embedding model '{model_name}'", e)
+    return model
+
+
+def warmup_embeddings(model_name: str = EMBEDDING_MODEL_NAME) -> None:
+    """
+    Loads the embedding model and runs one forward pass so the first request doesn't pay for it.
+    """
+    model = get_embedding_model(model_name)
+    # Bypass the cache so the forward pass actually runs
+    getattr(model, "underlying", model).embed_query("warmup")
+    logger.info(f"🔥 Embedding model '{model_name}' warmed up.")
+
+
+async def aembed_query(text: str, model_name: str = EMBEDDING_MODEL_NAME) -> List[float]:
+    """
+    Async `embed_query` that runs the model in the embedding executor.
+    """
+    loop = asyncio.get_running_loop()
+    model = await loop.run_in_executor(_executor, get_embedding_model, model_name)
+    return await loop.run_in_executor(_executor, model.embed_query, text)
+
+
+def embed_queries(texts: List[str], model_name: str = EMBEDDING_MODEL_NAME) -> List[List[float]]:
+    """
+    Embeds many queries in one batched forward pass. For sentence-transformers
+    models this gives the same vectors as calling `embed_query` on each text.
+    """
+    model = get_embedding_model(model_name)
+    if hasattr(model, "embed_queries"):
+        return model.embed_queries(texts)
+    return model.embed_documents(texts)
+
+
+async def aembed_queries(texts: List[str], model_name: str = EMBEDDING_MODEL_NAME) -> List[List[float]]:
+    """
+    Async `embed_queries` that runs the model in the embedding executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, embed_queries, texts, model_name)
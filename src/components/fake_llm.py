@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.components.tokens import count_tokens
+
+
+class FakeRateLimitError(Exception):
+    """
+    Raised by `FakeChatModel` past its request ceiling; looks like a provider 429.
+    """
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit reached, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Local stand-in for the Groq chat model, for tests and load experiments.
+
+    Replies with `response`, or when it is None with a deterministic
+    completion of `completion_words` words cycled from the prompt, after
+    `latency` seconds, streaming it word by word with `token_latency` between
+    chunks. With `requests_per_minute` set it rejects requests over that rate
+    with `FakeRateLimitError`, like a provider would.
+    """
+
+    response: Optional[str] = None
+    completion_words: int = 150
+    latency: float = 0.05
+    token_latency: float = 0.0
+    requests_per_minute: Optional[int] = None
+
+    _calls: deque = PrivateAttr(default_factory=deque)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _admit(self) -> None:
+        if not self.requests_per_minute:
+            return
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.requests_per_minute:
+                raise FakeRateLimitError(60 - (now - self._calls[0]))
+            self._calls.append(now)
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        if self.response is not None:
+            return self.response
+        words = " ".join(str(m.content) for m in messages).split()
+        if not words:
+            return "No input."
+        return " ".join(words[i % len(words)] for i in range(self.completion_words))
+
+    def _usage(self, messages: List[BaseMessage], reply: str) -> dict:
+        prompt = sum(count_tokens(str(m.content)) for m in messages)
+        completion = count_tokens(reply)
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _pieces(self, reply: str) -> List[str]:
+        words = reply.split(" ")
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._admit()
+        reply = self._reply(messages)
+        # Same total time as streaming the reply
+        time.sleep(self.latency + self.token_latency * len(self._pieces(reply)))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._admit()
+        reply = self._reply(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(self._pieces(reply)))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self._admit()
+        time.sleep(self.latency)
+        for piece in self._pieces(self._reply(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+            time.sleep(self.token_latency)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self._admit()
+        await asyncio.sleep(self.latency)
+        for piece in self._pieces(self._reply(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(self.token_latency)
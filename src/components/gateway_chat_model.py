@@ -0,0 +1,87 @@
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from src.components.tokens import count_tokens
+
+
+def _prompt_tokens(messages: List[BaseMessage]) -> int:
+    return sum(count_tokens(str(m.content)) for m in messages)
+
+
+def _used_tokens(result: ChatResult) -> Optional[int]:
+    usage = getattr(result.generations[0].message, "usage_metadata", None) if result.generations else None
+    return usage.get("total_tokens") if usage else None
+
+
+class GatewayChatModel(BaseChatModel):
+    """
+    Chat model that sends every call of the wrapped `llm` through `gateway`.
+    Drop-in for the wrapped model in chains, tools and streaming.
+    """
+
+    llm: BaseChatModel
+    gateway: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"gateway-{self.llm._llm_type}"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self.gateway.call(
+            lambda: self.llm._generate(messages, stop=stop, **kwargs),
+            _prompt_tokens(messages),
+            usage=_used_tokens,
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await self.gateway.acall(
+            lambda: self.llm._agenerate(messages, stop=stop, **kwargs),
+            _prompt_tokens(messages),
+            usage=_used_tokens,
+        )
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for chunk in self.gateway.stream(
+            lambda: self.llm._stream(messages, stop=stop, **kwargs),
+            _prompt_tokens(messages),
+        ):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async for chunk in self.gateway.astream(
+            lambda: self.llm._astream(messages, stop=stop, **kwargs),
+            _prompt_tokens(messages),
+        ):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
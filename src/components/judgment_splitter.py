@@ -0,0 +1,193 @@
+import copy
+import re
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+# One match per line decides what it is:
+#   noise   - a lone page number or footnote marker ("2"), signature dots
+#             ("…..........J.") or a separator rule ("=====", "-----")
+#   section - a heading of Supreme Court judgments, spaced out ("J U D G M E N T") or not
+#   number  - a numbered paragraph: "12." alone on its line, or "12. The appellant ..."
+_LINE = re.compile(
+    r"\s*(?:"
+    r"(?P<noise>\d{1,4}|[.…]{3,}\s*J\.?|[=\-_*]{5,})"
+    r"|(?P<section>ENTIRE JUDGMENT TEXT|J\s?U\s?D\s?G\s?M\s?E\s?N\s?T|O\s?R\s?D\s?E\s?R|HEADNOTE|CITATION|ACT"
+    r"|IN THE SUPREME COURT OF INDIA)\s*:?"
+    r"|(?P<number>\d{1,3})\.(?:\s+(?P<body>\S.*?))?"
+    r")\s*$",
+    re.IGNORECASE,
+)
+_SPACES = re.compile(r"\s+")
+
+_SECTION_NAMES = {
+    "ENTIREJUDGMENTTEXT": "JUDGMENT TEXT",
+    "INTHESUPREMECOURTOFINDIA": "HEADER",
+}
+
+
+def _section_name(heading: str) -> str:
+    key = _SPACES.sub("", heading.upper())
+    return _SECTION_NAMES.get(key, key)
+
+
+def _label(first: str, last: str) -> str:
+    return f"{first}-{last}" if first and last and first != last else first or last
+
+
+class _Unit(NamedTuple):
+    section: str
+    paragraph: str  # "" outside numbered paragraphs
+    text: str
+
+
+class JudgmentSplitter(TextSplitter):
+    """
+    Splits Supreme Court judgment text on its own structure instead of at
+    fixed character offsets.
+
+    One pass over the lines drops page numbers, footnote markers, signature
+    dots and separator rules, rejoins hard-wrapped lines, and cuts at section
+    headings ("J U D G M E N T", "ORDER", "HEADNOTE", a new judgment's court
+    header) and numbered paragraphs. A paragraph number only counts when it
+    follows the previous one, so quoted lists ("1. Whether ...") inside a
+    paragraph don't start a new one; numbering restarts at every section.
+
+    Consecutive paragraphs of a section are packed into chunks of up to
+    `chunk_size` characters without overlap. A section's short preamble
+    ("REPORTABLE", the author's name) is carried into the next section rather
+    than becoming a chunk of its own. Only a paragraph longer than `chunk_size`
+    is split further, at sentence boundaries with `chunk_overlap`; its first
+    piece also takes the paragraphs pending before it and its last piece is
+    packed with those after it. Text shorter than a quarter of `chunk_size`
+    (a paragraph number, an author line) never makes a chunk of its own
+    while anything follows it.
+    Each chunk's metadata gets `section` and `paragraphs` ("4", "4-6" or "" for unnumbered text).
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, **kwargs: Any):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._min_size = chunk_size // 4
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=[". ", "; ", ", ", " ", ""],
+            keep_separator="end",
+        )
+
+    def _units(self, text: str) -> Iterator[_Unit]:
+        section, paragraph, last_number = "", "", 0
+        lines: List[str] = []
+
+        def flush() -> Optional[_Unit]:
+            body = _SPACES.sub(" ", " ".join(lines)).strip()
+            lines.clear()
+            if not body:
+                return None
+            return _Unit(section, paragraph, f"{paragraph}. {body}" if paragraph else body)
+
+        for line in text.splitlines():
+            if not line or line.isspace():
+                continue
+            match = _LINE.match(line)
+            if match is None:
+                lines.append(line)
+            elif match.group("noise"):
+                continue
+            elif match.group("section"):
+                unit = flush()
+                if unit:
+                    yield unit
+                section, paragraph, last_number = _section_name(match.group("section")), "", 0
+            else:
+                number = int(match.group("number"))
+                # Text before any heading (a segment cut mid-judgment) takes its first number as is
+                if number != last_number + 1 and (section or last_number):
+                    lines.append(line)
+                    continue
+                unit = flush()
+                if unit:
+                    yield unit
+                paragraph, last_number = match.group("number"), number
+                if match.group("body"):
+                    lines.append(match.group("body"))
+
+        unit = flush()
+        if unit:
+            yield unit
+
+    def _split_long(self, text: str) -> List[str]:
+        """
+        Splits an over-long unit at sentence boundaries, joining pieces too
+        short to stand alone ("1." before a long first sentence) to the next one.
+        """
+        pieces: List[str] = []
+        carry = ""
+        for piece in self._fallback.split_text(text):
+            piece = f"{carry} {piece}" if carry else piece
+            carry = piece if len(piece) < self._min_size else ""
+            if not carry:
+                pieces.append(piece)
+        if carry:
+            # A short last piece is left to the caller, which packs it with what follows
+            pieces.append(carry)
+        return pieces
+
+    def _chunks(self, text: str) -> Iterator[Tuple[str, str, str]]:
+        """
+        Yields (text, section, paragraphs) per chunk.
+        """
+        parts: List[str] = []
+        size, section, first, last = 0, "", "", ""
+
+        def emit() -> Tuple[str, str, str]:
+            return " ".join(parts), section, _label(first, last)
+
+        for unit in self._units(text):
+            if parts and unit.section != section:
+                if size >= self._min_size:
+                    yield emit()
+                    parts, size = [], 0
+                else:
+                    section = unit.section
+
+            overflows = bool(parts) and size + 1 + len(unit.text) > self._chunk_size
+            # A short pending chunk is split together with the unit rather than emitted alone
+            if len(unit.text) > self._chunk_size or (overflows and size < self._min_size):
+                first = (first or unit.paragraph) if parts else unit.paragraph
+                *pieces, tail = self._split_long(" ".join(parts + [unit.text]))
+                for n, piece in enumerate(pieces):
+                    yield piece, unit.section, _label(first, unit.paragraph) if n == 0 else unit.paragraph
+                # The last piece stays pending, to be packed with what follows
+                if pieces:
+                    first = unit.paragraph
+                parts, size = [tail], len(tail)
+                section, last = unit.section, unit.paragraph or last
+                continue
+
+            if overflows:
+                yield emit()
+                parts, size = [], 0
+            if not parts:
+                section, first, last = unit.section, unit.paragraph, unit.paragraph
+            parts.append(unit.text)
+            size += len(unit.text) + (1 if size else 0)
+            first = first or unit.paragraph
+            last = unit.paragraph or last
+
+        if parts:
+            yield emit()
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _, _ in self._chunks(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            for chunk, section, paragraphs in self._chunks(text):
+                chunk_metadata = copy.deepcopy(metadata)
+                chunk_metadata.update(section=section, paragraphs=paragraphs)
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
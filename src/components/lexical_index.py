@@ -0,0 +1,310 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.config.config import LEXICAL_INDEX_DIR
+
+logger = get_logger(__name__)
+
+POSTINGS_FILE = "postings.jsonl"
+META_FILE = "meta.json"
+
+# Letters and digits only, so "No.3159" -> "no", "3159" and "(2004) 8 SCC 173" -> "2004", "8", "scc", "173"
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Frequent words that would make every query touch most of the corpus. "no" and "v" are kept
+# on purpose: they are part of case numbers ("Appeal No. 12") and titles ("State v. Rao").
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word and number tokens of `text`, without stopwords.
+    """
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over chunk ids, kept on local disk.
+
+    Layout of `index_dir`:
+        postings.jsonl  one {"id", "tf"} record per row (term frequencies of the chunk)
+        meta.json       row count and deleted rows
+
+    Rows are only ever appended: re-adding an id deletes its old row, and
+    `compact()` rewrites the file without deleted rows. Postings are kept in
+    memory as per-term lists, so adds are cheap; each term's BM25 weights are
+    computed on the first search that uses it after a write, which leaves a
+    query with a scatter-add per term and a top-k selection.
+    """
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._deleted = set()
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+
+        # Derived arrays and per-term BM25 weights, rebuilt lazily after writes
+        self._weights: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._length_array: Optional[np.ndarray] = None
+        self._alive_cache: Optional[np.ndarray] = None
+        self._avg_length = 0.0
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load(self) -> None:
+        if os.path.exists(self._path(META_FILE)):
+            with open(self._path(META_FILE), "r", encoding="utf-8") as f:
+                self._deleted = set(json.load(f).get("deleted", []))
+        if os.path.exists(self._path(POSTINGS_FILE)):
+            with open(self._path(POSTINGS_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    self._append(record["id"], record["tf"])
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids) if row not in self._deleted}
+        logger.info(f"Loaded BM25 index '{self.index_dir}' with {len(self)} documents.")
+
+    def _write_meta(self) -> None:
+        tmp_path = self._path(META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"count": len(self._ids), "deleted": sorted(self._deleted)}, f)
+        os.replace(tmp_path, self._path(META_FILE))
+
+    def _append(self, doc_id: str, tf: Dict[str, int]) -> None:
+        row = len(self._ids)
+        self._ids.append(doc_id)
+        self._row_of[doc_id] = row
+        self._lengths.append(sum(tf.values()))
+        for term, count in tf.items():
+            rows, counts = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            counts.append(count)
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._row_of
+
+    def ids(self) -> List[str]:
+        return list(self._row_of)
+
+    @property
+    def deleted_ratio(self) -> float:
+        """
+        Share of rows that are deleted and waiting for `compact()`.
+        """
+        return len(self._deleted) / len(self._ids) if self._ids else 0.0
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """
+        Indexes `texts` under `ids`. Existing ids are replaced, and an id
+        repeated within the batch keeps its last text.
+        """
+        if len(ids) != len(texts):
+            raise CustomException("ids and texts must have the same length.")
+        if not ids:
+            return
+        batch = dict(zip(ids, texts))
+        with self._lock:
+            self.delete([doc_id for doc_id in batch if doc_id in self._row_of], _save=False)
+            lines = []
+            for doc_id, text in batch.items():
+                tf = dict(Counter(tokenize(text)))
+                self._append(doc_id, tf)
+                lines.append(json.dumps({"id": doc_id, "tf": tf}, ensure_ascii=False) + "\n")
+            with open(self._path(POSTINGS_FILE), "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._length_array = self._alive_cache = None
+            self._write_meta()
+
+    def delete(self, ids: Iterable[str], _save: bool = True) -> bool:
+        """
+        Marks rows as deleted. Space is reclaimed by `compact()`.
+        """
+        with self._lock:
+            rows = [self._row_of.pop(doc_id) for doc_id in ids if doc_id in self._row_of]
+            if not rows:
+                return False
+            self._deleted.update(rows)
+            self._alive_cache = self._length_array = None
+            if _save:
+                self._write_meta()
+        return True
+
+    def compact(self) -> None:
+        """
+        Rewrites the postings file without deleted rows.
+        """
+        with self._lock:
+            if not self._deleted:
+                return
+            keep = sorted(self._row_of.items(), key=lambda item: item[1])
+            tfs = {row: {} for _, row in keep}
+            for term, (rows, counts) in self._postings.items():
+                for row, count in zip(rows, counts):
+                    if row in tfs:
+                        tfs[row][term] = count
+
+            self._ids, self._row_of, self._deleted, self._lengths = [], {}, set(), []
+            self._postings = {}
+            self._length_array = self._alive_cache = None
+            tmp_path = self._path(POSTINGS_FILE + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for doc_id, row in keep:
+                    self._append(doc_id, tfs[row])
+                    f.write(json.dumps({"id": doc_id, "tf": tfs[row]}, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self._path(POSTINGS_FILE))
+            self._write_meta()
+            logger.info(f"🧹 Compacted BM25 index '{self.index_dir}' to {len(self)} documents.")
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def _prepare(self) -> None:
+        if self._length_array is None:
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            alive = np.ones(len(self._ids), dtype=bool)
+            alive[list(self._deleted)] = False
+            self._alive_cache = alive
+            self._avg_length = float(lengths[alive].mean()) if alive.any() else 0.0
+            # Per-row part of the BM25 denominator, shared by every term
+            self._length_array = self.k1 * (1 - self.b + self.b * lengths / max(self._avg_length, 1e-9))
+            self._weights = {}
+
+    def _term_weights(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        weights = self._weights.get(term)
+        if weights is None:
+            posting = self._postings.get(term)
+            if posting is None:
+                return None
+            rows = np.asarray(posting[0], dtype=np.int64)
+            tf = np.asarray(posting[1], dtype=np.float32)
+            alive = self._alive_cache[rows]
+            df = int(alive.sum())
+            idf = np.log1p((len(self) - df + 0.5) / (df + 0.5))
+            score = idf * tf * (self.k1 + 1) / (tf + self._length_array[rows])
+            score[~alive] = 0
+            weights = (rows, score.astype(np.float32))
+            self._weights[term] = weights
+        return weights
+
+    def search(self, query: str, k: int = 20) -> Tuple[List[str], np.ndarray]:
+        """
+        Returns the ids and BM25 scores of the best `k` chunks for `query`, best first.
+        Chunks sharing no term with the query are never returned.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or len(self) == 0 or k <= 0:
+                return [], np.zeros(0, dtype=np.float32)
+            self._prepare()
+            postings = [weights for weights in map(self._term_weights, terms) if weights is not None]
+            ids, n = self._ids, len(self._ids)
+        if not postings:
+            return [], np.zeros(0, dtype=np.float32)
+
+        scores = np.zeros(n, dtype=np.float32)
+        for rows, weights in postings:
+            scores[rows] += weights
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [ids[row] for row in candidates], scores[candidates]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Fuses several best-first id lists into one with reciprocal rank fusion:
+    each id scores sum(weight / (k + rank)) over the lists it appears in.
+    Ties keep the order of first appearance, so the first list breaks them.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+_indexes: Dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def load_lexical_index(index_name: str = "test-txt-chatbot1") -> BM25Index:
+    """
+    Returns the process-wide BM25 index for `index_name`, under LEXICAL_INDEX_DIR.
+    """
+    with _indexes_lock:
+        index = _indexes.get(index_name)
+        if index is None:
+            index = BM25Index(os.path.join(LEXICAL_INDEX_DIR, index_name))
+            _indexes[index_name] = index
+    return index
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.components.lexical_index [documents]
+    rng = np.random.default_rng(0)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    vocab = [f"w{i}" for i in range(50_000)]
+    # Zipf-distributed words, roughly like running text
+    words = np.minimum(rng.zipf(1.2, size=size * 150), len(vocab)) - 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bm25 = BM25Index(tmp)
+        start = time.perf_counter()
+        for first in range(0, size, 10_000):
+            batch = range(first, min(first + 10_000, size))
+            bm25.add(
+                [f"doc-{i}" for i in batch],
+                [" ".join(vocab[w] for w in words[i * 150:(i + 1) * 150]) for i in batch],
+            )
+        print(f"Indexed {size} documents in {time.perf_counter() - start:.1f}s")
+
+        queries = [" ".join(vocab[w] for w in rng.choice(words, 6)) for _ in range(200)]
+        # First use of a term computes its weights; time the steady state
+        for query in queries:
+            bm25.search(query)
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            bm25.search(query, k=20)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"BM25 top-20 search: p50 {np.percentile(timings, 50):.2f} ms, p95 {np.percentile(timings, 95):.2f} ms")
@@ -1,41 +1,126 @@
-from dotenv import load_dotenv
-from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate
-from src.components.vector import store_documents_in_pinecone , load_existing_docsearch
+import threading
+import time
+
+from src.components.vector import load_vector_store, sync_lexical_index
+from src.components.lexical_index import load_lexical_index
+from src.components.reranker import get_reranker
 from src.common.logger import get_logger
-from src.common.custom_exception import CustomException
-from src.components.prompt import prompt
-from src.components.data_ingestion import load_documents_from_text_file, filter_to_minimal_docs
-from src.components.data_embedding import prepare_text_chunks_with_embeddings
-from langchain.retrievers import BM25Retriever, EnsembleRetriever
-from langchain_groq import ChatGroq
-from langchain.chains import RetrievalQA
-import os
+from src.components.llm_provider import get_chat_model
+from src.config.config import RETRIEVAL_MODE
+
+logger = get_logger(__name__)
+
+INDEX_NAME = "test-txt-chatbot1"
+
+# Built on first use (or by startup()), so importing this module does no I/O
+_docsearch = None
+_lexical_index = None
+_retriever = None
+_rag_chain = None
+_lock = threading.RLock()
+
+
+def get_llm():
+    """
+    Chat model used by the RAG chain (provider and model come from LLM_PROVIDER / LLM_MODEL_NAME).
+    """
+    return get_chat_model("rag")
+
+
+def get_docsearch():
+    """
+    Vector store for the knowledge base, opened on first use.
+    """
+    global _docsearch
+    if _docsearch is None:
+        with _lock:
+            if _docsearch is None:
+                _docsearch = load_vector_store(INDEX_NAME)
+    return _docsearch
+
 
+def get_lexical_index():
+    """
+    BM25 index fused into retrieval when RETRIEVAL_MODE is "hybrid", else None.
+    """
+    global _lexical_index
+    if RETRIEVAL_MODE != "hybrid":
+        return None
+    if _lexical_index is None:
+        with _lock:
+            if _lexical_index is None:
+                index = load_lexical_index(INDEX_NAME)
+                sync_lexical_index(get_docsearch(), index)
+                _lexical_index = index
+    return _lexical_index
 
-load_dotenv()
 
+def get_retriever():
+    global _retriever
+    if _retriever is None:
+        with _lock:
+            if _retriever is None:
+                _retriever = get_docsearch().as_retriever(search_type="similarity", search_kwargs={"k": 5})
+    return _retriever
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+def get_rag_chain():
+    """
+    Stuff-documents chain: takes {"input": query, "context": [Document]} with
+    the already retrieved blocks (metadata "source" and "page") and returns
+    the answer text. Retrieval is not part of the chain, so callers search once.
+    """
+    global _rag_chain
+    if _rag_chain is None:
+        with _lock:
+            if _rag_chain is None:
+                # Chain modules import transformers (via langchain_core); load them on first use
+                from langchain.chains.combine_documents import create_stuff_documents_chain
+                from src.components.prompt import prompt, document_prompt, document_separator
 
-os.environ["GROQ_API_KEY"] = GROQ_API_KEY
+                _rag_chain = create_stuff_documents_chain(
+                    get_llm(),
+                    prompt,
+                    document_prompt=document_prompt,
+                    document_separator=document_separator,
+                )
+    return _rag_chain
 
-from langchain_groq import ChatGroq
 
-llm = ChatGroq(
-    groq_api_key=GROQ_API_KEY,
-    model_name="Llama3-8b-8192",
-    temperature=0.5,
-    top_p=0.9
-)
+def startup() -> None:
+    """
+    Builds the vector store, chain, embedding model, BM25 index and re-ranker
+    up front, so the first request doesn't pay for them. Call from the serving process' startup hook.
+    """
+    from src.components.embeddings import warmup_embeddings
 
+    start = time.perf_counter()
+    warmup_embeddings()
+    get_rag_chain()
+    get_lexical_index()
+    get_reranker()
+    logger.info(f"🚀 RAG pipeline ready in {time.perf_counter() - start:.2f}s")
 
 
-docsearch = load_existing_docsearch("test-txt-chatbot1")
-retriever = docsearch.as_retriever(search_type="similarity", search_kwargs={"k":5})
+def shutdown() -> None:
+    """
+    Drops the cached clients; the next use builds them again.
+    """
+    global _docsearch, _lexical_index, _retriever, _rag_chain
+    with _lock:
+        _docsearch = _lexical_index = _retriever = _rag_chain = None
+    logger.info("RAG pipeline shut down.")
 
 
-question_answer_chain = create_stuff_documents_chain(llm, prompt)
-rag_chain = create_retrieval_chain(retriever, question_answer_chain)
\ No newline at end of file
+def __getattr__(name: str):
+    # Backwards compatible `from src.components.llm import rag_chain` (builds on access)
+    factories = {
+        "llm": get_llm,
+        "docsearch": get_docsearch,
+        "lexical_index": get_lexical_index,
+        "retriever": get_retriever,
+        "rag_chain": get_rag_chain,
+    }
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
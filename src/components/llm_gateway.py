@@ -0,0 +1,388 @@
+import asyncio
+import random
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.config.config import (
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_QUEUE_TIMEOUT,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMQueueTimeout(CustomException):
+    """
+    A request could not get an LLM slot before its deadline.
+    """
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return _status_code(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Rate limits, provider 5xx, timeouts and dropped connections are worth retrying.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("RateLimitError", "APIConnectionError", "APITimeoutError", "TimeoutError")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to `per_minute`.
+
+    `reserve` takes the units immediately (the level may go negative) and
+    returns how long the caller must wait, so waiters are served in order.
+    A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def refund(self, amount: float) -> None:
+        """
+        Returns unused units (or charges more when `amount` is negative).
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that halves on provider rate limits and creeps back up
+    by one slot per `limit` successes, never exceeding `max_limit`.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.active = 0
+        self._cond = threading.Condition()
+
+    def _take(self) -> bool:
+        if self.active < int(self.limit):
+            self.active += 1
+            return True
+        return False
+
+    def acquire(self, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(self._take, timeout=max(0.0, timeout))
+
+    async def aacquire(self, deadline: float) -> bool:
+        # Polling keeps the event loop free without parking a thread per waiter
+        delay = 0.005
+        while True:
+            with self._cond:
+                if self._take():
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def release(self, rate_limited: bool = False) -> None:
+        with self._cond:
+            self.active -= 1
+            if rate_limited:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class LLMGateway:
+    """
+    Shared admission control in front of one LLM provider account.
+
+    Every call waits for the request and token buckets, a concurrency slot and
+    any provider back-off (Retry-After), all within `queue_timeout` seconds,
+    otherwise it fails fast with `LLMQueueTimeout`. Retryable errors are
+    retried with full-jitter exponential backoff inside the same deadline.
+    Token reservations use an estimate that is corrected from the reported usage.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 30000,
+        max_concurrency: int = 8,
+        max_retries: int = 4,
+        queue_timeout: float = 30.0,
+        expected_completion_tokens: int = 512,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.expected_completion_tokens = expected_completion_tokens
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+
+    # --- admission ---------------------------------------------------------
+
+    def _reserve(self, estimate: int, deadline: float) -> float:
+        """
+        Reserves budget for one attempt and returns the wait, or raises if it would miss the deadline.
+        """
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimate))
+        wait = max(wait, self._paused_until - time.monotonic())
+        if time.monotonic() + wait > deadline:
+            self.requests.refund(1)
+            self.tokens.refund(estimate)
+            self._timed_out()
+        return wait
+
+    def _timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        raise LLMQueueTimeout(f"LLM is saturated; request not admitted within {self.queue_timeout:.0f}s")
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if is_rate_limit_error(error):
+            with self._lock:
+                self.rate_limited += 1
+                if retry_after:
+                    # Everyone waits out the provider's back-off, not just this request
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        with self._lock:
+            self.retries += 1
+        return max(delay, retry_after or 0.0)
+
+    def _settle(self, estimate: int, used: Optional[int]) -> None:
+        if used is not None:
+            self.tokens.refund(estimate - used)
+
+    def estimate_tokens(self, prompt_tokens: int) -> int:
+        return prompt_tokens + self.expected_completion_tokens
+
+    # --- calls -------------------------------------------------------------
+
+    def call(self, fn: Callable[[], T], prompt_tokens: int, usage: Callable[[T], Optional[int]] = lambda r: None) -> T:
+        """
+        Runs `fn` under the gateway's limits, retrying retryable errors.
+        """
+        estimate = self.estimate_tokens(prompt_tokens)
+        deadline = time.monotonic() + self.queue_timeout
+        attempt = 0
+        while True:
+            time.sleep(self._reserve(estimate, deadline))
+            if not self.limiter.acquire(deadline - time.monotonic()):
+                self._timed_out()
+            rate_limited = False
+            try:
+                with self._lock:
+                    self.calls += 1
+                result = fn()
+                self._settle(estimate, usage(result))
+                return result
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"⚠️ LLM call failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+            finally:
+                self.limiter.release(rate_limited)
+            if time.monotonic() + delay > deadline:
+                self._timed_out()
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        prompt_tokens: int,
+        usage: Callable[[T], Optional[int]] = lambda r: None,
+    ) -> T:
+        """
+        Async version of `call`.
+        """
+        estimate = self.estimate_tokens(prompt_tokens)
+        deadline = time.monotonic() + self.queue_timeout
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._reserve(estimate, deadline))
+            if not await self.limiter.aacquire(deadline):
+                self._timed_out()
+            rate_limited = False
+            try:
+                with self._lock:
+                    self.calls += 1
+                result = await fn()
+                self._settle(estimate, usage(result))
+                return result
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"⚠️ LLM call failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+            finally:
+                self.limiter.release(rate_limited)
+            if time.monotonic() + delay > deadline:
+                self._timed_out()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stream(self, fn: Callable[[], Iterator[T]], prompt_tokens: int) -> Iterator[T]:
+        """
+        Streams `fn()` under the gateway's limits. Only failures before the
+        first chunk are retried; the slot is held until the stream ends.
+        """
+        estimate = self.estimate_tokens(prompt_tokens)
+        deadline = time.monotonic() + self.queue_timeout
+        attempt = 0
+        while True:
+            time.sleep(self._reserve(estimate, deadline))
+            if not self.limiter.acquire(deadline - time.monotonic()):
+                self._timed_out()
+            rate_limited = False
+            started = False
+            try:
+                with self._lock:
+                    self.calls += 1
+                for chunk in fn():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if started or not is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"⚠️ LLM stream failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+            finally:
+                self.limiter.release(rate_limited)
+            if time.monotonic() + delay > deadline:
+                self._timed_out()
+            time.sleep(delay)
+            attempt += 1
+
+    async def astream(self, fn: Callable[[], AsyncIterator[T]], prompt_tokens: int) -> AsyncIterator[T]:
+        """
+        Async version of `stream`.
+        """
+        estimate = self.estimate_tokens(prompt_tokens)
+        deadline = time.monotonic() + self.queue_timeout
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._reserve(estimate, deadline))
+            if not await self.limiter.aacquire(deadline):
+                self._timed_out()
+            rate_limited = False
+            started = False
+            try:
+                with self._lock:
+                    self.calls += 1
+                async for chunk in fn():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if started or not is_retryable_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"⚠️ LLM stream failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+            finally:
+                self.limiter.release(rate_limited)
+            if time.monotonic() + delay > deadline:
+                self._timed_out()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "active": self.limiter.active,
+            "concurrency_limit": int(self.limiter.limit),
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    Returns the process-wide gateway shared by every LLM client in the app.
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                max_concurrency=LLM_MAX_CONCURRENCY,
+                max_retries=LLM_MAX_RETRIES,
+                queue_timeout=LLM_QUEUE_TIMEOUT,
+                expected_completion_tokens=LLM_EXPECTED_COMPLETION_TOKENS,
+            )
+    return _gateway
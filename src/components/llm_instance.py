@@ -1,14 +1,8 @@
-import os
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from src.components.llm_provider import get_chat_model
 
-load_dotenv()
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-llm = ChatGroq(
-    groq_api_key=GROQ_API_KEY,
-    model_name="Llama3-8b-8192",
-    temperature=0.8,
-    top_p=0.9
-)
+def __getattr__(name: str):
+    # `from src.components.llm_instance import llm` builds the tools' chat model on access
+    if name == "llm":
+        return get_chat_model("tools")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict
+
+from dotenv import load_dotenv
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.components.llm_gateway import get_llm_gateway
+from src.config.config import (
+    LLM_PROVIDER,
+    LLM_MODEL_NAME,
+    FAKE_LLM_LATENCY,
+    FAKE_LLM_TOKEN_LATENCY,
+    FAKE_LLM_COMPLETION_WORDS,
+)
+
+if TYPE_CHECKING:
+    # Chat model classes import transformers (via langchain_core); they are loaded on first use
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+# Sampling temperature per use of the LLM
+ROLE_TEMPERATURE = {
+    "rag": 0.5,
+    "tools": 0.8,
+}
+
+
+def _groq(model_name: str, temperature: float) -> "BaseChatModel":
+    from langchain_groq import ChatGroq
+
+    # Retries are left to the shared gateway so 429s are handled in one place
+    return ChatGroq(
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        model_name=model_name,
+        temperature=temperature,
+        top_p=0.9,
+        max_retries=0
+    )
+
+
+def _fake(model_name: str, temperature: float) -> "BaseChatModel":
+    from src.components.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        latency=FAKE_LLM_LATENCY,
+        token_latency=FAKE_LLM_TOKEN_LATENCY,
+        completion_words=FAKE_LLM_COMPLETION_WORDS,
+    )
+
+
+_providers: Dict[str, Callable[[str, float], "BaseChatModel"]] = {
+    "groq": _groq,
+    "fake": _fake,
+}
+
+
+def register_provider(name: str, factory: Callable[[str, float], "BaseChatModel"]) -> None:
+    """
+    Makes `factory(model_name, temperature)` available as LLM_PROVIDER=`name`.
+    """
+    _providers[name] = factory
+
+
+def create_chat_model(
+    temperature: float,
+    provider: str = LLM_PROVIDER,
+    model_name: str = LLM_MODEL_NAME,
+) -> "BaseChatModel":
+    """
+    Builds a chat model for `provider`, behind the shared LLM gateway.
+    """
+    from src.components.gateway_chat_model import GatewayChatModel
+
+    factory = _providers.get(provider)
+    if factory is None:
+        raise CustomException(f"Unknown LLM provider '{provider}'. Available: {', '.join(_providers)}")
+    logger.info(f"Using LLM provider '{provider}' ({model_name}, temperature={temperature}).")
+    return GatewayChatModel(llm=factory(model_name, temperature), gateway=get_llm_gateway())
+
+
+_models: Dict[str, "BaseChatModel"] = {}
+_lock = threading.Lock()
+
+
+def get_chat_model(role: str = "rag") -> "BaseChatModel":
+    """
+    Returns the process-wide chat model for `role` ("rag" or "tools").
+    """
+    with _lock:
+        model = _models.get(role)
+        if model is None:
+            model = create_chat_model(ROLE_TEMPERATURE[role])
+            _models[role] = model
+    return model
@@ -0,0 +1,486 @@
+import json
+import mmap
+import os
+import threading
+import uuid
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.components.scoring import normalize
+from src.components.ann_index import IVFIndex
+from src.components.quantization import make_quantizer, save_quantizer, load_quantizer
+
+logger = get_logger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+DOCSTORE_FILE = "docstore.jsonl"
+META_FILE = "meta.json"
+IVF_FILE = "ivf.npz"
+CODES_FILE = "codes.u8"
+CODEC_FILE = "codec.npz"
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Vector store kept on local disk, used as a drop-in for Pinecone.
+
+    Layout of `index_dir`:
+        vectors.f32     unit-length float32 rows, memory-mapped for search
+        docstore.jsonl  one {"id", "text", "metadata"} record per row
+        meta.json       dimension, row count and deleted rows
+        ivf.npz         IVF lists, when approximate search is used
+        codes.u8        compressed copy of every row, when compression is used
+        codec.npz       trained int8 / product quantizer
+
+    Search is cosine similarity, either exact (one matrix-vector product) or
+    approximate through an `IVFIndex` that is built on first use, kept up to
+    date as rows are appended, and persisted next to the vectors. Once the
+    index holds `retrain_growth` times the rows its lists were trained on, the
+    next search retrains it, so list count and centroids follow the corpus.
+
+    With compression, only the codes are held in memory and candidates are
+    scored with asymmetric distances; the best `rerank` of them are then
+    re-scored exactly from the memory-mapped floats, which the OS pages in on
+    demand and can share between worker processes. An index too small to
+    train the quantizer on (product quantization needs 256 rows) is searched
+    exactly until it grows.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        embedding: Embeddings,
+        dimension: int = 384,
+        search_mode: str = "exact",
+        nprobe: int = 8,
+        compression: str = "none",
+        rerank: int = 50,
+        retrain_growth: float = 2.0,
+    ):
+        if search_mode not in ("exact", "ivf"):
+            raise CustomException(f"Unknown search mode '{search_mode}'. Use 'exact' or 'ivf'.")
+        if compression not in ("none", "int8", "pq"):
+            raise CustomException(f"Unknown compression '{compression}'. Use 'none', 'int8' or 'pq'.")
+        if compression != "none":
+            # Fails now, not on the first search, if the quantizer can't handle this dimension
+            make_quantizer(compression, dimension)
+
+        self.index_dir = index_dir
+        self._embedding = embedding
+        self.dimension = dimension
+        self.search_mode = search_mode
+        self.nprobe = nprobe
+        self.compression = compression
+        self.rerank = rerank
+        self.retrain_growth = retrain_growth
+
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._docstore = None
+        self._ids: List[str] = []
+        self._row_of = {}
+        self._deleted = set()
+        self._alive_cache = None
+        self._ivf: Optional[IVFIndex] = None
+        self._codec = None
+        self._codec_skipped_at = None  # row count at which training last found too few rows
+
+        # Growing arrays are kept as parts and merged on first read, so a
+        # long ingestion doesn't re-copy them on every batch
+        self._offset_parts = [np.zeros(1, dtype=np.int64)]
+        self._code_parts = []
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load(self) -> None:
+        meta_path = self._path(META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dimension"] != self.dimension:
+                raise CustomException(
+                    f"Index at {self.index_dir} has dimension {meta['dimension']}, expected {self.dimension}."
+                )
+            self._deleted = set(meta.get("deleted", []))
+
+        # Row offsets into the docstore let us read one record without parsing the file
+        offsets = [0]
+        ids = []
+        if os.path.exists(self._path(DOCSTORE_FILE)):
+            with open(self._path(DOCSTORE_FILE), "rb") as f:
+                for line in f:
+                    offsets.append(offsets[-1] + len(line))
+                    ids.append(json.loads(line)["id"])
+        self._offset_parts = [np.array(offsets, dtype=np.int64)]
+        self._ids = ids
+        self._row_of = {doc_id: row for row, doc_id in enumerate(ids) if row not in self._deleted}
+        self._remap()
+
+        # Catch up on rows appended by a writer that didn't maintain the index / codes
+        if self.search_mode == "ivf" and os.path.exists(self._path(IVF_FILE)):
+            self._ivf = IVFIndex.load(self._path(IVF_FILE))
+            if len(self._ivf) < len(ids):
+                self._ivf.add(np.asarray(self._vectors[len(self._ivf):]), range(len(self._ivf), len(ids)))
+                self._ivf.save(self._path(IVF_FILE))
+
+        if self.compression != "none" and os.path.exists(self._path(CODEC_FILE)):
+            self._codec = load_quantizer(self._path(CODEC_FILE), self.dimension)
+            codes = np.fromfile(self._path(CODES_FILE), dtype=np.uint8).reshape(-1, self._codec.code_size)
+            self._code_parts = [codes]
+            if len(codes) < len(ids):
+                self._append_codes(np.asarray(self._vectors[len(codes):]))
+        logger.info(f"Loaded local vector index '{self.index_dir}' with {len(self)} documents.")
+
+    def _remap(self) -> None:
+        rows = len(self._ids)
+        if rows:
+            self._vectors = np.memmap(
+                self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.dimension)
+            )
+            with open(self._path(DOCSTORE_FILE), "rb") as f:
+                self._docstore = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            self._docstore = None
+        self._alive_cache = None
+
+    def _merged(self, parts: list) -> np.ndarray:
+        if len(parts) > 1:
+            parts[:] = [np.concatenate(parts)]
+        return parts[0]
+
+    @property
+    def _offsets(self) -> np.ndarray:
+        return self._merged(self._offset_parts)
+
+    @property
+    def _alive(self) -> np.ndarray:
+        if self._alive_cache is None:
+            alive = np.ones(len(self._ids), dtype=bool)
+            alive[list(self._deleted)] = False
+            self._alive_cache = alive
+        return self._alive_cache
+
+    def _append_codes(self, vectors: np.ndarray) -> None:
+        codes = self._codec.encode(vectors)
+        with open(self._path(CODES_FILE), "ab") as f:
+            f.write(codes.tobytes())
+        self._code_parts.append(codes)
+
+    def _write_meta(self) -> None:
+        meta = {
+            "dimension": self.dimension,
+            "count": len(self._ids),
+            "metric": "cosine",
+            "deleted": sorted(self._deleted),
+        }
+        tmp_path = self._path(META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(META_FILE))
+
+    def _record(self, row: int) -> dict:
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return json.loads(self._docstore[start:end])
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted)
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        vectors,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Appends pre-computed vectors and their texts. Existing ids are replaced,
+        and an id repeated within the batch keeps its last occurrence.
+        """
+        vectors = normalize(vectors).reshape(-1, self.dimension)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        if not (len(texts) == len(vectors) == len(metadatas) == len(ids)):
+            raise CustomException("texts, vectors, metadatas and ids must have the same length.")
+        last = {doc_id: n for n, doc_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            texts, metadatas, ids = [texts[n] for n in keep], [metadatas[n] for n in keep], [ids[n] for n in keep]
+            vectors = vectors[keep]
+
+        with self._lock:
+            self.delete([doc_id for doc_id in ids if doc_id in self._row_of])
+
+            lines = [
+                (json.dumps({"id": i, "text": t, "metadata": m}, ensure_ascii=False) + "\n").encode("utf-8")
+                for i, t, m in zip(ids, texts, metadatas)
+            ]
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path(DOCSTORE_FILE), "ab") as f:
+                f.writelines(lines)
+
+            first_row = len(self._ids)
+            last_offset = self._offset_parts[-1][-1]
+            self._offset_parts.append(last_offset + np.cumsum([len(line) for line in lines], dtype=np.int64))
+            self._ids.extend(ids)
+            self._row_of.update({doc_id: first_row + n for n, doc_id in enumerate(ids)})
+            self._write_meta()
+            self._remap()
+
+            if self._ivf is not None:
+                self._ivf.add(vectors, range(first_row, first_row + len(ids)))
+                self._ivf.save(self._path(IVF_FILE))
+            if self._codec is not None:
+                self._append_codes(vectors)
+
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Marks rows as deleted. Space is reclaimed by `compact()`.
+        """
+        if not ids:
+            return False
+        with self._lock:
+            rows = [self._row_of.pop(doc_id) for doc_id in ids if doc_id in self._row_of]
+            if not rows:
+                return False
+            self._deleted.update(rows)
+            self._alive_cache = None
+            self._write_meta()
+        return True
+
+    def compact(self) -> None:
+        """
+        Rewrites the index files without deleted rows.
+        """
+        with self._lock:
+            if not self._deleted:
+                return
+            keep = [row for row in range(len(self._ids)) if row not in self._deleted]
+            records = [self._record(row) for row in keep]
+            vectors = np.asarray(self._vectors[keep], dtype=np.float32)
+
+            # Drop the mappings before removing the files they point at
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            if self._docstore is not None:
+                self._docstore.close()
+                self._docstore = None
+
+            self._ivf, self._codec, self._code_parts = None, None, []
+            for name in (VECTORS_FILE, DOCSTORE_FILE, IVF_FILE, CODES_FILE, CODEC_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._ids, self._row_of, self._deleted = [], {}, set()
+            self._offset_parts = [np.zeros(1, dtype=np.int64)]
+            self._remap()
+
+            if records:
+                self.add_embeddings(
+                    [r["text"] for r in records],
+                    vectors,
+                    metadatas=[r["metadata"] for r in records],
+                    ids=[r["id"] for r in records],
+                )
+            else:
+                self._write_meta()
+            logger.info(f"🧹 Compacted local vector index '{self.index_dir}' to {len(self)} documents.")
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def rebuild_index(self) -> None:
+        """
+        Retrains the IVF lists and/or quantizer over all current rows,
+        e.g. after the corpus has grown a lot.
+        """
+        with self._lock:
+            if self.search_mode == "ivf":
+                self._build_ivf()
+            if self.compression != "none":
+                self._build_codec()
+
+    def _build_ivf(self) -> None:
+        if len(self._ids) == 0:
+            return
+        self._ivf = IVFIndex.build(self._vectors, nprobe=self.nprobe)
+        self._ivf.save(self._path(IVF_FILE))
+        logger.info(f"Built IVF index with {self._ivf.nlist} lists over {len(self._ids)} vectors.")
+
+    def _build_codec(self) -> None:
+        if len(self._ids) == self._codec_skipped_at:
+            return
+        codec = make_quantizer(self.compression, self.dimension)
+        # Until there are enough rows to train on, search stays exact on the floats
+        if len(self._ids) < codec.min_train_size:
+            self._codec_skipped_at = len(self._ids)
+            return
+        codec.train(self._vectors)
+        save_quantizer(codec, self._path(CODEC_FILE))
+        self._codec, self._code_parts = codec, []
+        if os.path.exists(self._path(CODES_FILE)):
+            os.remove(self._path(CODES_FILE))
+        for start in range(0, len(self._ids), 65536):
+            self._append_codes(np.asarray(self._vectors[start:start + 65536]))
+        logger.info(f"Encoded {len(self._ids)} vectors with {self.compression} compression.")
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def _search(self, query_vector, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize(query_vector).reshape(-1)
+        with self._lock:
+            if len(self) == 0 or k <= 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+            use_ivf = self.search_mode == "ivf"
+            if use_ivf and self._ivf is None:
+                self._build_ivf()
+            elif use_ivf and len(self._ids) > self.retrain_growth * max(self._ivf.trained_rows, 1):
+                logger.info(
+                    f"IVF index was trained on {self._ivf.trained_rows} vectors and now holds "
+                    f"{len(self._ids)}; retraining."
+                )
+                self._build_ivf()
+            if self.compression != "none" and self._codec is None:
+                self._build_codec()
+
+            codes = self._merged(self._code_parts) if self._codec is not None else None
+
+            # Candidate rows: one IVF probe, or every row with deleted ones masked out
+            if use_ivf:
+                rows = self._ivf.candidates(query, nprobe=self.nprobe, alive=self._alive)
+                if len(rows) == 0:
+                    return rows, np.zeros(0, dtype=np.float32)
+                source = codes[rows] if codes is not None else np.asarray(self._vectors[rows])
+            else:
+                rows = np.arange(len(self._ids))
+                source = codes if codes is not None else self._vectors
+
+            if codes is None:
+                scores = np.asarray(source @ query)
+            else:
+                # Asymmetric distances on the in-memory codes
+                scores = self._codec.scores(source, query)
+            if not use_ivf and self._deleted:
+                scores[~self._alive] = -np.inf
+
+            k = min(k, len(self))
+            if codes is None or self.rerank <= 0:
+                top = self._top_k(scores, k)
+                return rows[top], scores[top]
+
+            # Exact re-rank of the best compressed candidates from the memory-mapped floats
+            shortlist = np.sort(rows[self._top_k(scores, max(k, self.rerank))])
+            exact = np.asarray(self._vectors[shortlist]) @ query
+            if not use_ivf and self._deleted:
+                exact[~self._alive[shortlist]] = -np.inf
+            top = self._top_k(exact, k)
+            return shortlist[top], exact[top]
+
+    def _documents(self, rows) -> List[Document]:
+        # Callers hold the lock from search to read: compact() renumbers rows and remaps the files
+        docs = []
+        for row in rows:
+            record = self._record(row)
+            docs.append(Document(id=record["id"], page_content=record["text"], metadata=record["metadata"]))
+        return docs
+
+    def ids(self) -> List[str]:
+        """
+        Ids of all live rows.
+        """
+        with self._lock:
+            return list(self._row_of)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return self.get_with_vectors(ids)[0]
+
+    def get_with_vectors(self, ids: Sequence[str]) -> Tuple[List[Document], List[List[float]]]:
+        """
+        Documents and stored vectors for `ids`, skipping ids that aren't in the index.
+        """
+        with self._lock:
+            rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            return self._documents(rows), np.asarray(self._vectors[rows]).tolist()
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        with self._lock:
+            rows, scores = self._search(embedding, k)
+            return list(zip(self._documents(rows), scores.tolist()))
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_with_vectors(
+        self, query: str, k: int = 4, query_vector: Optional[List[float]] = None
+    ) -> Tuple[List[Document], List[float], List[List[float]]]:
+        """
+        Same contract as `vector.similarity_search_with_vectors` for the Pinecone backend.
+        """
+        if query_vector is None:
+            query_vector = self._embedding.embed_query(query)
+        with self._lock:
+            rows, _ = self._search(query_vector, k)
+            return self._documents(rows), query_vector, np.asarray(self._vectors[rows]).tolist()
+
+    def _select_relevance_score_fn(self):
+        # Scores are cosine similarities in [-1, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        index_dir: str = "vector_index",
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(index_dir=index_dir, embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.common.logger import get_logger
+from src.config.config import MANIFEST_DIR
+
+logger = get_logger(__name__)
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 of a file, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _version_path(index_name: str) -> str:
+    return os.path.join(MANIFEST_DIR, f"{index_name}.version")
+
+
+def read_index_version(index_name: str) -> str:
+    """
+    Returns the current version stamp of an index ("" if it was never bumped).
+    """
+    try:
+        with open(_version_path(index_name), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def bump_index_version(index_name: str) -> str:
+    """
+    Records that the index contents changed, so caches built on it can be invalidated.
+    """
+    version = f"{time.time_ns()}"
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    tmp_path = _version_path(index_name) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, _version_path(index_name))
+    return version
+
+
+def with_chunk_ids(chunks: Iterable[Document]) -> Iterator[Tuple[Document, str]]:
+    """
+    Pairs each chunk with a deterministic id built from its source and content hash.
+
+    Identical chunks within one source get an occurrence suffix, so the same
+    text always maps to the same ids across runs.
+    """
+    seen: Dict[str, int] = {}
+    for doc in chunks:
+        source = doc.metadata.get("source", "unknown")
+        key = f"{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}-{hash_text(doc.page_content)[:32]}"
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        yield doc, key if occurrence == 0 else f"{key}-{occurrence}"
+
+
+class IndexManifest:
+    """
+    Record of what is already in a vector index, stored as JSON:
+
+        {"files": {"<source>": {"hash": "<sha256 of file>", "chunks": ["<chunk id>", ...]}}}
+
+    Used to skip unchanged files, embed only new chunks and delete stale ones.
+    """
+
+    def __init__(self, path: str, files: Optional[dict] = None):
+        self.path = path
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path: str) -> "IndexManifest":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f).get("files", {}))
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+    def sources(self) -> List[str]:
+        return list(self.files)
+
+    def is_unchanged(self, source: str, file_hash: str) -> bool:
+        entry = self.files.get(source)
+        return entry is not None and entry["hash"] == file_hash
+
+    def chunk_ids(self, source: str) -> List[str]:
+        return self.files.get(source, {}).get("chunks", [])
+
+    def update(self, source: str, file_hash: str, chunk_ids: List[str]) -> None:
+        self.files[source] = {"hash": file_hash, "chunks": chunk_ids}
+
+    def remove(self, source: str) -> List[str]:
+        """
+        Drops a source and returns the chunk ids it had.
+        """
+        return self.files.pop(source, {}).get("chunks", [])
@@ -1,6 +1,4 @@
-from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 from langchain_core.prompts import SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 system_prompt = (
@@ -66,5 +64,11 @@ If asked about any legal websites, databases, or repositories, reply:
 # )
 prompt = ChatPromptTemplate.from_messages([
     SystemMessagePromptTemplate.from_template(system_prompt),
+    # Conversation so far: rolling summary (MEMORY_MODE=summary) and recent turns
+    MessagesPlaceholder("history", optional=True),
     HumanMessagePromptTemplate.from_template("{input}")
-])
\ No newline at end of file
+])
+
+# How each retrieved block is written into {context} by the stuff-documents chain
+document_prompt = PromptTemplate.from_template("{page_content}\n📄 **Source**: `{source}` | **Page**: {page}")
+document_separator = "\n\n---\n\n"
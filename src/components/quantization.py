@@ -0,0 +1,174 @@
+import numpy as np
+
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+
+class ScalarQuantizer:
+    """
+    int8 scalar quantization: each dimension is mapped linearly onto 256 levels
+    between its trained min and max. 384-d vectors shrink from 1536 to 384 bytes.
+    """
+
+    kind = "int8"
+    min_train_size = 1
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.low = None
+        self.step = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.low is not None
+
+    @property
+    def code_size(self) -> int:
+        return self.dimension
+
+    def train(self, vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.low = vectors.min(axis=0)
+        self.step = np.maximum(vectors.max(axis=0) - self.low, 1e-12) / 255.0
+
+    def encode(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        return np.clip(np.rint((vectors - self.low) / self.step), 0, 255).astype(np.uint8)
+
+    def decode(self, codes) -> np.ndarray:
+        return self.low + codes.astype(np.float32) * self.step
+
+    def scores(self, codes: np.ndarray, query: np.ndarray, block: int = 65536) -> np.ndarray:
+        """
+        Asymmetric inner products: the query stays float, the database stays compressed.
+        """
+        scaled = query * self.step
+        bias = float(self.low @ query)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), block):
+            out[start:start + block] = codes[start:start + block].astype(np.float32) @ scaled + bias
+        return out
+
+    def state(self) -> dict:
+        return {"low": self.low, "step": self.step}
+
+    def set_state(self, state: dict) -> None:
+        self.low, self.step = state["low"], state["step"]
+
+
+class ProductQuantizer:
+    """
+    Product quantization: vectors are split into `m` sub-vectors, each replaced by
+    the id of its nearest of 256 trained sub-centroids. With m=48 a 384-d vector
+    takes 48 bytes. Inner products are computed from an (m, 256) lookup table.
+    """
+
+    kind = "pq"
+    min_train_size = 256  # one vector per sub-centroid
+
+    def __init__(self, dimension: int, m: int = 48, iterations: int = 15, train_size: int = 65536, seed: int = 0):
+        if dimension % m:
+            raise CustomException(
+                f"Product quantization splits vectors into {m} sub-vectors, but dimension {dimension} "
+                f"is not divisible by {m}. Use another LOCAL_COMPRESSION."
+            )
+        if train_size < self.min_train_size:
+            raise CustomException(f"Product quantization needs a train_size of at least {self.min_train_size}.")
+        self.dimension = dimension
+        self.m = m
+        self.dsub = dimension // m
+        self.iterations = iterations
+        self.train_size = train_size
+        self.seed = seed
+        self.codebooks = None  # (m, 256, dsub)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def code_size(self) -> int:
+        return self.m
+
+    def _split(self, vectors) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).reshape(-1, self.m, self.dsub)
+
+    @staticmethod
+    def _nearest(sub: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        dist = (centroids ** 2).sum(axis=1)[None, :] - 2.0 * sub @ centroids.T
+        return np.argmin(dist, axis=1)
+
+    def train(self, vectors) -> None:
+        rng = np.random.default_rng(self.seed)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) < self.min_train_size:
+            raise CustomException(f"Product quantization needs at least {self.min_train_size} training vectors.")
+        if len(vectors) > self.train_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), self.train_size, replace=False))]
+
+        subs = self._split(vectors)
+        codebooks = np.empty((self.m, 256, self.dsub), dtype=np.float32)
+        for j in range(self.m):
+            sub = subs[:, j, :]
+            centroids = sub[rng.choice(len(sub), 256, replace=False)].copy()
+            for _ in range(self.iterations):
+                assign = self._nearest(sub, centroids)
+                counts = np.bincount(assign, minlength=256)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, sub)
+                filled = counts > 0
+                centroids[filled] = sums[filled] / counts[filled, None]
+            codebooks[j] = centroids
+        self.codebooks = codebooks
+        logger.info(f"Trained product quantizer with {self.m} sub-quantizers on {len(vectors)} vectors.")
+
+    def encode(self, vectors, block: int = 65536) -> np.ndarray:
+        subs = self._split(vectors)
+        codes = np.empty((len(subs), self.m), dtype=np.uint8)
+        for start in range(0, len(subs), block):
+            part = subs[start:start + block]
+            for j in range(self.m):
+                codes[start:start + block, j] = self._nearest(part[:, j, :], self.codebooks[j])
+        return codes
+
+    def decode(self, codes) -> np.ndarray:
+        return self.codebooks[np.arange(self.m), codes].reshape(len(codes), self.dimension)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Asymmetric inner products via a per-query (m, 256) lookup table.
+        """
+        table = np.einsum("jkd,jd->jk", self.codebooks, query.reshape(self.m, self.dsub))
+        return table[np.arange(self.m), codes].sum(axis=1, dtype=np.float32)
+
+    def state(self) -> dict:
+        return {"codebooks": self.codebooks, "m": np.array(self.m)}
+
+    def set_state(self, state: dict) -> None:
+        self.codebooks = state["codebooks"]
+        self.m = int(state["m"])
+        self.dsub = self.dimension // self.m
+
+
+def make_quantizer(kind: str, dimension: int):
+    """
+    Returns an untrained quantizer for `kind` ("int8" or "pq").
+    """
+    if kind == "int8":
+        return ScalarQuantizer(dimension)
+    if kind == "pq":
+        return ProductQuantizer(dimension)
+    raise CustomException(f"Unknown compression '{kind}'. Use 'none', 'int8' or 'pq'.")
+
+
+def save_quantizer(quantizer, path: str) -> None:
+    np.savez(path, kind=np.array(quantizer.kind), **quantizer.state())
+
+
+def load_quantizer(path: str, dimension: int):
+    with np.load(path) as data:
+        quantizer = make_quantizer(str(data["kind"]), dimension)
+        quantizer.set_state({key: data[key] for key in data.files if key != "kind"})
+    return quantizer
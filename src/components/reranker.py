@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.common.logger import get_logger
+from src.config.config import (
+    RERANK_ENABLED,
+    RERANK_MODEL_NAME,
+    RERANK_BATCH_SIZE,
+    RERANK_MAX_LENGTH,
+    RERANK_BUDGET_MS,
+    RERANK_TOP_K,
+)
+
+logger = get_logger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Second retrieval stage: re-scores (query, chunk) pairs with a local
+    cross-encoder on CPU and keeps the best ones.
+
+    Pairs are scored in batches of `batch_size`, shortest chunks first so each
+    batch pads to similar lengths. After every batch the time for the rest is
+    projected from the batches so far; if it would overrun `budget_ms`, scoring
+    stops and the first-stage order is kept, so a slow model or a burst of
+    traffic costs at most about the budget.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 16,
+        max_length: int = 512,
+        budget_ms: float = 300,
+    ):
+        # Imported here: sentence-transformers loads torch
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self.reranked = 0
+        self.fallbacks = 0
+
+    def scores(self, query: str, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Cross-encoder score per text, or None when the latency budget would be exceeded.
+        """
+        start = time.perf_counter()
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        scores = np.empty(len(texts), dtype=np.float32)
+        batches = math.ceil(len(texts) / self.batch_size)
+        for n in range(batches):
+            rows = order[n * self.batch_size:(n + 1) * self.batch_size]
+            scores[rows] = self.model.predict(
+                [(query, texts[row]) for row in rows],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if n + 1 < batches and elapsed_ms * batches / (n + 1) > self.budget_ms:
+                logger.warning(
+                    f"⚠️ Re-ranking would exceed {self.budget_ms:.0f}ms "
+                    f"({elapsed_ms:.0f}ms for {n + 1}/{batches} batches); keeping first-stage order."
+                )
+                return None
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        docs: List[Document],
+        doc_vectors: List[List[float]],
+        top_k: int,
+        fallback_k: Optional[int] = None,
+    ) -> Tuple[List[Document], List[List[float]]]:
+        """
+        Returns the best `top_k` docs (and their vectors) by cross-encoder score,
+        or the first `fallback_k` (default `top_k`) in their original order when
+        over budget.
+        """
+        scores = self.scores(query, [doc.page_content for doc in docs]) if docs else None
+        if scores is None:
+            self.fallbacks += bool(docs)
+            fallback_k = fallback_k or top_k
+            return docs[:fallback_k], doc_vectors[:fallback_k]
+        self.reranked += 1
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        return [docs[i] for i in best], [doc_vectors[i] for i in best]
+
+    def stats(self) -> dict:
+        return {"model": self.model_name, "reranked": self.reranked, "fallbacks": self.fallbacks}
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+_reranker_failed = False
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    Returns the process-wide re-ranker, or None when RERANK_ENABLED is off or
+    the model can't be loaded (retrieval then stays single-stage).
+    """
+    global _reranker, _reranker_failed
+    if not RERANK_ENABLED or _reranker_failed:
+        return None
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None and not _reranker_failed:
+                try:
+                    logger.info(f"Loading re-ranker '{RERANK_MODEL_NAME}'...")
+                    _reranker = CrossEncoderReranker(
+                        RERANK_MODEL_NAME,
+                        batch_size=RERANK_BATCH_SIZE,
+                        max_length=RERANK_MAX_LENGTH,
+                        budget_ms=RERANK_BUDGET_MS,
+                    )
+                    logger.info(f"✅ Re-ranker '{RERANK_MODEL_NAME}' loaded.")
+                except Exception as e:
+                    _reranker_failed = True
+                    logger.error(f"❌ Failed to load re-ranker '{RERANK_MODEL_NAME}', re-ranking disabled: {e}")
+    return _reranker
+
+
+def rerank_results(
+    query: str,
+    search: Tuple[List[Document], List[float], List[List[float]]],
+    top_k: int,
+) -> Tuple[List[Document], List[float], List[List[float]]]:
+    """
+    Applies the re-ranker to an over-fetched `similarity_search_with_vectors`
+    result. A successful re-rank keeps at most RERANK_TOP_K chunks, since
+    better-ordered chunks let the prompt carry fewer of them; otherwise the
+    first `top_k` first-stage chunks are kept.
+    """
+    docs, query_vector, doc_vectors = search
+    reranker = get_reranker()
+    if reranker is None:
+        return docs[:top_k], query_vector, doc_vectors[:top_k]
+    docs, doc_vectors = reranker.rerank(query, docs, doc_vectors, min(top_k, RERANK_TOP_K), fallback_k=top_k)
+    return docs, query_vector, doc_vectors
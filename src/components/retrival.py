@@ -1,107 +1,630 @@
-import numpy as np
-from typing import Tuple, List, Dict
-from sklearn.metrics.pairwise import cosine_similarity
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.schema import Document
-from langchain.memory import ConversationBufferMemory
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from langchain_core.documents import Document
 
 from src.common.logger import get_logger
-from src.components.llm import rag_chain, retriever
+from src.components.context_packer import pack_context
+from src.components.embeddings import get_embedding_model, aembed_query, aembed_queries
+from src.components.llm import get_rag_chain, get_docsearch, get_lexical_index
+from src.components.scoring import score_answer
+from src.components.reranker import get_reranker, rerank_results
+from src.components.semantic_cache import get_semantic_cache
+from src.components.session_memory import ConversationMemory
+from src.components.summary_memory import format_source_refs
+from src.components.tokens import count_tokens
+from src.components.vector import similarity_search_with_vectors, batch_similarity_search_with_vectors
+from src.config.config import (
+    EMBEDDING_MODEL_NAME,
+    BATCH_LLM_CONCURRENCY,
+    BATCH_SEARCH_CONCURRENCY,
+    RERANK_FETCH_K,
+    CONTEXT_PACKING,
+    CONTEXT_MAX_TOKENS,
+    CONTEXT_DEDUP_THRESHOLD,
+)
 
 logger = get_logger(__name__)
 
 
+class _StageTimer:
+    """
+    Wall-clock milliseconds per stage of one request, logged when it finishes.
+    """
+
+    def __init__(self):
+        self.start = self._last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def report(self, **counts: Any) -> Dict[str, Any]:
+        metrics = {f"{stage}_ms": round(ms, 1) for stage, ms in self.stages.items()}
+        metrics["total_ms"] = round((time.perf_counter() - self.start) * 1000, 1)
+        metrics.update(counts)
+        logger.info("⏱️ " + " ".join(f"{key}={value}" for key, value in metrics.items()))
+        return metrics
+
+
+def _fetch_k(top_k: int) -> int:
+    # Over-fetch candidates for the re-ranker when it is on
+    return max(top_k, RERANK_FETCH_K) if get_reranker() is not None else top_k
+
+
+def _retrieve(query: str, query_emb: List[float], top_k: int) -> Tuple[List[Document], List[float], List[List[float]]]:
+    """
+    First-stage search (dense or hybrid), then cross-encoder re-ranking when enabled.
+    """
+    search = similarity_search_with_vectors(
+        get_docsearch(), query, k=_fetch_k(top_k), query_vector=query_emb, lexical_index=get_lexical_index()
+    )
+    return rerank_results(query, search, top_k)
+
+
+def _prepare_context(
+    retrieved_docs: List[Document],
+    context_embs: List[List[float]],
+    top_k: int,
+) -> Tuple[List[Document], List[Dict[str, str]], List[List[float]]]:
+    """
+    Builds the context blocks for the stuff-documents chain (which annotates
+    each with its source and page), the matching source list and one vector
+    per block. With CONTEXT_PACKING on, overlapping chunks are merged,
+    near-duplicates dropped and the context kept within CONTEXT_MAX_TOKENS.
+    """
+    retrieved_docs, context_embs = retrieved_docs[:top_k], context_embs[:top_k]
+    if CONTEXT_PACKING:
+        packed = pack_context(
+            retrieved_docs,
+            context_embs,
+            max_tokens=CONTEXT_MAX_TOKENS,
+            dedup_threshold=CONTEXT_DEDUP_THRESHOLD,
+        )
+        logger.info(
+            f"📦 Packed {packed.chunks_in} chunks into {len(packed.docs)} blocks: "
+            f"{packed.tokens_in} -> {packed.tokens_out} tokens ({packed.tokens_saved} saved)"
+        )
+        retrieved_docs, context_embs = packed.docs, packed.vectors
+
+    context_docs = []
+    sources = []
+
+    for doc in retrieved_docs:
+        meta = doc.metadata
+        source = meta.get("source", "unknown.pdf")
+        page = meta.get("page", "N/A")
+        content = doc.page_content.strip().replace("\n", " ")
+
+        context_docs.append(Document(page_content=content, metadata={"source": source, "page": page}))
+        sources.append({
+            "source": source,
+            "page": page,
+            "excerpt": content[:1000]
+        })
+        if meta.get("paragraphs"):
+            sources[-1]["paragraphs"] = meta["paragraphs"]
+
+    return context_docs, sources, context_embs
+
+
+def _chain_input(query: str, context_docs: List[Document], memory: ConversationMemory = None) -> Dict[str, Any]:
+    """
+    Input of the rag chain. The conversation so far is read before this turn is remembered.
+    """
+    return {"input": query, "context": context_docs, "history": memory.buffer if memory else []}
+
+
+def _prompt_tokens(chain_input: Dict[str, Any]) -> int:
+    """
+    Tokens of the prompt the chain sends for `chain_input`.
+    """
+    # Imported here: the prompt modules load transformers (see llm.get_rag_chain)
+    from langchain_core.prompts import format_document
+    from src.components.prompt import prompt, document_prompt, document_separator
+
+    context = document_separator.join(format_document(doc, document_prompt) for doc in chain_input["context"])
+    return count_tokens(prompt.format(**{**chain_input, "context": context}))
+
+
+def _extract_answer(response: str) -> str:
+    answer = response.strip()
+    if not answer:
+        answer = "⚠️ No clear answer could be generated from the retrieved legal documents."
+    return answer
+
+
+def _score(query_emb, answer_emb, context_embs, sources: List[Dict[str, str]]) -> Tuple[float, float]:
+    scores = score_answer(query_emb, answer_emb, context_embs)
+    similarity, faithfulness = scores.similarity, scores.faithfulness
+
+    for source, relevance in zip(sources, scores.chunk_relevance):
+        source["relevance"] = round(float(relevance), 4)
+
+    logger.info(f"✅ Similarity (query ↔ answer): {similarity:.4f}")
+    logger.info(f"✅ Faithfulness (context ↔ answer): {faithfulness:.4f}")
+    return similarity, faithfulness
+
+
+def _remember(memory: ConversationMemory, query: str, answer: str, sources: List[Dict[str, str]]) -> None:
+    if memory:
+        memory.chat_memory.add_user_message(query)
+        memory.chat_memory.add_ai_message(answer)
+        memory.chat_memory.add_ai_message(format_source_refs(sources))
+
+
+def _format_output(answer: str, sources: List[Dict[str, str]]) -> str:
+    """
+    Appends a readable sources section with clickable links.
+    """
+    sources_text = "\n\n📚 **Sources Referenced:**\n"
+    for s in sources:
+        source_path = s['source']
+        # Make link clickable if it's a URL or PDF file path
+        link = f"[{source_path}]({source_path})" if source_path.startswith("http") or source_path.endswith(".pdf") else f"`{source_path}`"
+        sources_text += f"- 📄 {link} (Page {s['page']}): {s['excerpt']}...\n"
+
+    return f"{answer}\n\n{sources_text.strip()}"
+
+
+def _answer_cache(memory: ConversationMemory):
+    """
+    The semantic cache, or None once the session has history: the cache is keyed
+    on the query alone, but the chain also sees the history.
+    """
+    if memory and memory.buffer:
+        return None
+    return get_semantic_cache()
+
+
+def _copy_result(result: Tuple[str, float, float, List[Dict[str, str]]]) -> Tuple[str, float, float, List[Dict[str, str]]]:
+    # Callers annotate sources in place; cached results must not be shared
+    output, similarity, faithfulness, sources = result
+    return output, similarity, faithfulness, [dict(source) for source in sources]
+
+
+def _cached(cache, query_emb) -> Optional[Tuple[str, Tuple[str, float, float, List[Dict[str, str]]]]]:
+    cached = cache.lookup(query_emb) if cache is not None else None
+    if cached is None:
+        return None
+    answer, result = cached
+    return answer, _copy_result(result)
+
+
+def _finish(
+    query: str,
+    answer: str,
+    answer_emb,
+    query_emb,
+    context_embs,
+    sources: List[Dict[str, str]],
+    memory: ConversationMemory,
+    cache,
+) -> Tuple[str, float, float, List[Dict[str, str]]]:
+    """
+    Scores the answer, updates memory, formats the output and caches the result.
+    """
+    similarity, faithfulness = _score(query_emb, answer_emb, context_embs, sources)
+    _remember(memory, query, answer, sources)
+
+    result = (_format_output(answer, sources), similarity, faithfulness, sources)
+    if cache is not None:
+        cache.store(query, query_emb, (answer, _copy_result(result)))
+    return result
+
+
+def _final_event(
+    result: Tuple[str, float, float, List[Dict[str, str]]],
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    answer, similarity, faithfulness, sources = result
+    event = {
+        "answer": answer,
+        "similarity_score": similarity,
+        "faithfulness_score": faithfulness,
+        "sources": sources,
+    }
+    if metrics is not None:
+        event["metrics"] = metrics
+    return "final", event
+
+
 def retrieve_and_score_query(
     query: str,
-    embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
     top_k: int = 5,
-    memory: ConversationBufferMemory = None
+    memory: ConversationMemory = None
 ) -> Tuple[str, float, float, List[Dict[str, str]]]:
     """
     Executes a legal RAG query, returns answer with source PDF metadata.
+    Near-identical questions are answered from the semantic cache without an LLM call.
+    Logs the time of each stage and the prompt size.
     """
     try:
         logger.info(f"🔍 Query: {query}")
-        embedding = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        timer = _StageTimer()
+        embedding = get_embedding_model(embedding_model_name)
 
-        if memory:
-            history = memory.buffer
-            combined_query = f"{history}\nUser: {query}"
-        else:
-            combined_query = query
+        # ⚡ Step 0: Serve paraphrases of an already answered question from the cache
+        query_emb = embedding.embed_query(query)
+        timer.lap("embed")
+        cache = _answer_cache(memory)
+        cached = _cached(cache, query_emb)
+        timer.lap("cache")
+        if cached is not None:
+            answer, result = cached
+            _remember(memory, query, answer, result[3])
+            timer.report(cache_hit=True)
+            return result
 
-        # 🔍 Step 1: Retrieve relevant documents
-        retrieved_docs: List[Document] = retriever.get_relevant_documents(query)
+        # 🔍 Step 1: Retrieve relevant documents (once) along with their stored vectors
+        retrieved_docs, query_emb, context_embs = _retrieve(query, query_emb, top_k)
+        timer.lap("retrieve")
 
         if not retrieved_docs:
+            timer.report(chunks=0)
             return "❗ No relevant documents found.", 0.0, 0.0, []
 
-        # 📚 Step 2: Prepare detailed context with metadata
-        context_chunks = []
-        sources = []
-
-        for doc in retrieved_docs[:top_k]:
-            meta = doc.metadata
-            source = meta.get("source", "unknown.pdf")
-            page = meta.get("page", "N/A")
-            content = doc.page_content.strip().replace("\n", " ")
-
-            # Build a source-annotated content block
-            chunk = (
-                f"{content}\n"
-                f"📄 **Source**: `{source}` | **Page**: {page}"
-            )
-            context_chunks.append(chunk)
-
-            sources.append({
-                "source": source,
-                "page": page,
-                "excerpt": content[:1000]
-            })
-
-        # Combine chunks for context input to the LLM
-        full_context = "\n\n---\n\n".join(context_chunks)
-
-        # 🧠 Step 3: LLM call with full context
-        response = rag_chain.invoke({
-            "input": query,
-            "context": full_context
-        })
+        # 📚 Step 2: Pack the retrieved chunks into source-annotated context blocks
+        context_docs, sources, context_embs = _prepare_context(retrieved_docs, context_embs, top_k)
+        chain_input = _chain_input(query, context_docs, memory)
+        prompt_tokens = _prompt_tokens(chain_input)
+        timer.lap("context")
+
+        # 🧠 Step 3: LLM call on exactly those blocks
+        answer = _extract_answer(get_rag_chain().invoke(chain_input))
+        timer.lap("llm")
+
+        # 📐 Step 4: Embedding-based scoring (only the answer needs a new embedding),
+        # 💾 memory update and 📄 readable sources section
+        answer_emb = embedding.embed_query(answer)
+        result = _finish(query, answer, answer_emb, query_emb, context_embs, sources, memory, cache)
+        timer.lap("score")
+        timer.report(chunks=len(retrieved_docs), blocks=len(context_docs), prompt_tokens=prompt_tokens)
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Retrieval failed: {e}")
+        raise e
+
+
+async def aretrieve_and_score_query(
+    query: str,
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
+    top_k: int = 5,
+    memory: ConversationMemory = None
+) -> Tuple[str, float, float, List[Dict[str, str]]]:
+    """
+    Async version of `retrieve_and_score_query` for the API.
 
-        answer = response.get("answer", "").strip()
-        if not answer:
-            answer = "⚠️ No clear answer could be generated from the retrieved legal documents."
+    The LLM call is awaited, embeddings run in the embedding executor and the
+    blocking vector-store query runs in the default executor, so the event loop
+    stays free while a request waits.
+    """
+    try:
+        logger.info(f"🔍 Query: {query}")
+        timer = _StageTimer()
+        loop = asyncio.get_running_loop()
+
+        query_emb = await aembed_query(query, embedding_model_name)
+        timer.lap("embed")
+        cache = _answer_cache(memory)
+        cached = _cached(cache, query_emb)
+        timer.lap("cache")
+        if cached is not None:
+            answer, result = cached
+            _remember(memory, query, answer, result[3])
+            timer.report(cache_hit=True)
+            return result
+
+        retrieved_docs, query_emb, context_embs = await loop.run_in_executor(
+            None, _retrieve, query, query_emb, top_k
+        )
+        timer.lap("retrieve")
+
+        if not retrieved_docs:
+            timer.report(chunks=0)
+            return "❗ No relevant documents found.", 0.0, 0.0, []
+
+        context_docs, sources, context_embs = _prepare_context(retrieved_docs, context_embs, top_k)
+        chain_input = _chain_input(query, context_docs, memory)
+        prompt_tokens = _prompt_tokens(chain_input)
+        timer.lap("context")
+
+        answer = _extract_answer(await get_rag_chain().ainvoke(chain_input))
+        timer.lap("llm")
+
+        answer_emb = await aembed_query(answer, embedding_model_name)
+        result = _finish(query, answer, answer_emb, query_emb, context_embs, sources, memory, cache)
+        timer.lap("score")
+        timer.report(chunks=len(retrieved_docs), blocks=len(context_docs), prompt_tokens=prompt_tokens)
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Retrieval failed: {e}")
+        raise e
+
+
+def stream_retrieve_and_score_query(
+    query: str,
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
+    top_k: int = 5,
+    memory: ConversationMemory = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Streaming version of `retrieve_and_score_query`.
+
+    Yields ("token", text) while the LLM generates the answer, then one
+    ("final", {...}) event with the formatted answer, scores, sources and
+    the request's stage timings and prompt size under "metrics".
+    """
+    try:
+        logger.info(f"🔍 Query: {query}")
+        timer = _StageTimer()
+        embedding = get_embedding_model(embedding_model_name)
 
-        # 📐 Step 4: Embedding-based scoring
         query_emb = embedding.embed_query(query)
+        timer.lap("embed")
+        cache = _answer_cache(memory)
+        cached = _cached(cache, query_emb)
+        timer.lap("cache")
+        if cached is not None:
+            answer, result = cached
+            _remember(memory, query, answer, result[3])
+            yield "token", answer
+            yield _final_event(result, timer.report(cache_hit=True))
+            return
+
+        retrieved_docs, query_emb, context_embs = _retrieve(query, query_emb, top_k)
+        timer.lap("retrieve")
+
+        if not retrieved_docs:
+            yield _final_event(("❗ No relevant documents found.", 0.0, 0.0, []), timer.report(chunks=0))
+            return
+
+        context_docs, sources, context_embs = _prepare_context(retrieved_docs, context_embs, top_k)
+        chain_input = _chain_input(query, context_docs, memory)
+        prompt_tokens = _prompt_tokens(chain_input)
+        timer.lap("context")
+
+        parts = []
+        for token in get_rag_chain().stream(chain_input):
+            if token:
+                if not parts:
+                    timer.lap("first_token")
+                parts.append(token)
+                yield "token", token
+        answer = _extract_answer("".join(parts))
+        timer.lap("generate")
+
         answer_emb = embedding.embed_query(answer)
-        context_embs = embedding.embed_documents([doc.page_content for doc in retrieved_docs[:top_k]])
-        avg_context_emb = np.mean(context_embs, axis=0)
+        result = _finish(query, answer, answer_emb, query_emb, context_embs, sources, memory, cache)
+        timer.lap("score")
+        metrics = timer.report(chunks=len(retrieved_docs), blocks=len(context_docs), prompt_tokens=prompt_tokens)
+        yield _final_event(result, metrics)
 
-        similarity = cosine_similarity([query_emb], [answer_emb])[0][0]
-        faithfulness = cosine_similarity([avg_context_emb], [answer_emb])[0][0]
+    except Exception as e:
+        logger.error(f"❌ Retrieval failed: {e}")
+        raise e
 
-        logger.info(f"✅ Similarity (query ↔ answer): {similarity:.4f}")
-        logger.info(f"✅ Faithfulness (context ↔ answer): {faithfulness:.4f}")
 
-        # 💾 Step 5: Update memory
-        if memory:
-            memory.chat_memory.add_user_message(query)
-            memory.chat_memory.add_ai_message(answer)
-            memory.chat_memory.add_ai_message(sources)
+async def astream_retrieve_and_score_query(
+    query: str,
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
+    top_k: int = 5,
+    memory: ConversationMemory = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Async version of `stream_retrieve_and_score_query` for the API.
+    """
+    try:
+        logger.info(f"🔍 Query: {query}")
+        timer = _StageTimer()
+        loop = asyncio.get_running_loop()
 
-        # 📄 Step 6: Format readable sources section with clickable links
-        sources_text = "\n\n📚 **Sources Referenced:**\n"
-        for s in sources:
-            source_path = s['source']
-            # Make link clickable if it's a URL or PDF file path
-            link = f"[{source_path}]({source_path})" if source_path.startswith("http") or source_path.endswith(".pdf") else f"`{source_path}`"
-            sources_text += f"- 📄 {link} (Page {s['page']}): {s['excerpt']}...\n"
+        query_emb = await aembed_query(query, embedding_model_name)
+        timer.lap("embed")
+        cache = _answer_cache(memory)
+        cached = _cached(cache, query_emb)
+        timer.lap("cache")
+        if cached is not None:
+            answer, result = cached
+            _remember(memory, query, answer, result[3])
+            yield "token", answer
+            yield _final_event(result, timer.report(cache_hit=True))
+            return
 
-        final_output = f"{answer}\n\n{sources_text.strip()}"
+        retrieved_docs, query_emb, context_embs = await loop.run_in_executor(
+            None, _retrieve, query, query_emb, top_k
+        )
+        timer.lap("retrieve")
 
-        return final_output, similarity, faithfulness, sources
+        if not retrieved_docs:
+            yield _final_event(("❗ No relevant documents found.", 0.0, 0.0, []), timer.report(chunks=0))
+            return
+
+        context_docs, sources, context_embs = _prepare_context(retrieved_docs, context_embs, top_k)
+        chain_input = _chain_input(query, context_docs, memory)
+        prompt_tokens = _prompt_tokens(chain_input)
+        timer.lap("context")
+
+        parts = []
+        async for token in get_rag_chain().astream(chain_input):
+            if token:
+                if not parts:
+                    timer.lap("first_token")
+                parts.append(token)
+                yield "token", token
+        answer = _extract_answer("".join(parts))
+        timer.lap("generate")
+
+        answer_emb = await aembed_query(answer, embedding_model_name)
+        result = _finish(query, answer, answer_emb, query_emb, context_embs, sources, memory, cache)
+        timer.lap("score")
+        metrics = timer.report(chunks=len(retrieved_docs), blocks=len(context_docs), prompt_tokens=prompt_tokens)
+        yield _final_event(result, metrics)
 
     except Exception as e:
         logger.error(f"❌ Retrieval failed: {e}")
         raise e
+
+
+def _batch_item(
+    query: str,
+    result: Optional[Tuple[str, float, float, List[Dict[str, str]]]] = None,
+    error: Optional[str] = None,
+) -> Dict[str, Any]:
+    answer, similarity, faithfulness, sources = result or (None, None, None, [])
+    return {
+        "query": query,
+        "answer": answer,
+        "similarity_score": similarity,
+        "faithfulness_score": faithfulness,
+        "sources": sources,
+        "error": error,
+    }
+
+
+async def aretrieve_and_score_batch(
+    queries: List[str],
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
+    top_k: int = 5,
+    llm_concurrency: int = BATCH_LLM_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Answers many independent legal queries (no conversation memory).
+
+    All queries are embedded in one batch and searched concurrently, then the
+    LLM calls run concurrently with at most `llm_concurrency` in flight and
+    the answers are embedded in one more batch for scoring.
+
+    Returns one dict per query, in input order, with the same fields as a
+    single retrieval plus `query` and `error`. A failed item has `answer`
+    None and the error message; it doesn't fail the rest of the batch.
+    """
+    logger.info(f"🔍 Batch of {len(queries)} queries")
+    timer = _StageTimer()
+    loop = asyncio.get_running_loop()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+
+    query_embs = await aembed_queries(queries, embedding_model_name)
+    timer.lap("embed")
+
+    cache = get_semantic_cache()
+    todo = []
+    for i, (query, query_emb) in enumerate(zip(queries, query_embs)):
+        cached = _cached(cache, query_emb)
+        if cached is not None:
+            results[i] = _batch_item(query, cached[1])
+        else:
+            todo.append(i)
+    timer.lap("cache")
+
+    def search_all():
+        searches = batch_similarity_search_with_vectors(
+            get_docsearch(),
+            [queries[i] for i in todo],
+            [query_embs[i] for i in todo],
+            k=_fetch_k(top_k),
+            max_workers=BATCH_SEARCH_CONCURRENCY,
+            lexical_index=get_lexical_index(),
+        )
+        return [
+            search if isinstance(search, Exception) else rerank_results(queries[i], search, top_k)
+            for i, search in zip(todo, searches)
+        ]
+
+    searches = await loop.run_in_executor(None, search_all)
+    timer.lap("retrieve")
+
+    semaphore = asyncio.Semaphore(llm_concurrency)
+    prompt_tokens = []
+
+    async def answer(query: str, search):
+        if isinstance(search, Exception):
+            raise search
+        retrieved_docs, query_emb, context_embs = search
+        if not retrieved_docs:
+            return None
+        context_docs, sources, context_embs = _prepare_context(retrieved_docs, context_embs, top_k)
+        chain_input = _chain_input(query, context_docs)
+        prompt_tokens.append(_prompt_tokens(chain_input))
+        async with semaphore:
+            response = await get_rag_chain().ainvoke(chain_input)
+        return _extract_answer(response), query_emb, context_embs, sources
+
+    outcomes = await asyncio.gather(
+        *(answer(queries[i], search) for i, search in zip(todo, searches)),
+        return_exceptions=True,
+    )
+    timer.lap("llm")
+
+    answered = [(i, outcome) for i, outcome in zip(todo, outcomes) if isinstance(outcome, tuple)]
+    answer_embs = await aembed_queries([outcome[0] for _, outcome in answered], embedding_model_name) if answered else []
+    for (i, (answer_text, query_emb, context_embs, sources)), answer_emb in zip(answered, answer_embs):
+        result = _finish(queries[i], answer_text, answer_emb, query_emb, context_embs, sources, None, cache)
+        results[i] = _batch_item(queries[i], result)
+    timer.lap("score")
+
+    for i, outcome in zip(todo, outcomes):
+        if outcome is None:
+            results[i] = _batch_item(queries[i], ("❗ No relevant documents found.", 0.0, 0.0, []))
+        elif isinstance(outcome, BaseException):
+            logger.error(f"❌ Retrieval failed for batch item {i}: {outcome}")
+            results[i] = _batch_item(queries[i], error=str(outcome))
+
+    timer.report(
+        queries=len(queries),
+        cache_hits=len(queries) - len(todo),
+        prompt_tokens=sum(prompt_tokens),
+        max_prompt_tokens=max(prompt_tokens, default=0),
+    )
+    return results
+
+
+def retrieve_and_score_batch(
+    queries: List[str],
+    embedding_model_name: str = EMBEDDING_MODEL_NAME,
+    top_k: int = 5,
+    llm_concurrency: int = BATCH_LLM_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Sync entry point to `aretrieve_and_score_batch` for scripts and jobs
+    (not for use inside a running event loop).
+    """
+    return asyncio.run(aretrieve_and_score_batch(queries, embedding_model_name, top_k, llm_concurrency))
+
+
+if __name__ == "__main__":
+    # Load test of our own pipeline against the local stand-in LLM:
+    # LLM_PROVIDER=fake SEMANTIC_CACHE_ENABLED=false python -m src.components.retrival [requests] [concurrency]
+    import sys
+    import numpy as np
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    async def load_test():
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, errors = [], 0
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await aretrieve_and_score_query(f"What did the court hold about the contract in matter {i}?")
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        ms = np.array(latencies) * 1000
+        print(f"{total} requests, concurrency {concurrency}: {total / elapsed:.1f} req/s, {errors} errors")
+        print(f"latency ms  p50 {np.percentile(ms, 50):.0f}  p95 {np.percentile(ms, 95):.0f}  p99 {np.percentile(ms, 99):.0f}")
+
+    asyncio.run(load_test())
@@ -0,0 +1,85 @@
+import numpy as np
+from typing import List, NamedTuple, Sequence
+
+
+class AnswerScores(NamedTuple):
+    similarity: float  # query ↔ answer
+    faithfulness: float  # mean context ↔ answer
+    chunk_relevance: np.ndarray  # query ↔ each context chunk
+
+
+class BatchScores(NamedTuple):
+    similarity: np.ndarray
+    faithfulness: np.ndarray
+    chunk_relevance: List[np.ndarray]
+
+
+def normalize(vectors) -> np.ndarray:
+    """
+    Returns `vectors` as float32 rows scaled to unit length (zero rows stay zero).
+    """
+    arr = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(arr, axis=-1, keepdims=True)
+    return arr / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def score_answer(query_vector, answer_vector, context_vectors) -> AnswerScores:
+    """
+    Scores one answer against its query and retrieved chunks with a single matrix product.
+    """
+    contexts = np.asarray(context_vectors, dtype=np.float32)
+    if contexts.size == 0:
+        similarity = float(normalize(query_vector) @ normalize(answer_vector))
+        return AnswerScores(similarity, 0.0, np.zeros(0, dtype=np.float32))
+
+    left = normalize(np.vstack([query_vector, answer_vector]))
+    right = normalize(np.vstack([answer_vector, contexts.mean(axis=0), contexts]))
+    gram = left @ right.T
+
+    return AnswerScores(
+        similarity=float(gram[0, 0]),
+        faithfulness=float(gram[1, 1]),
+        chunk_relevance=gram[0, 2:],
+    )
+
+
+def score_batch(
+    query_vectors,
+    answer_vectors,
+    context_vectors: Sequence,
+) -> BatchScores:
+    """
+    Scores many (query, answer, contexts) triples at once.
+
+    Args:
+        query_vectors: (B, d) query embeddings
+        answer_vectors: (B, d) answer embeddings
+        context_vectors: B sequences of chunk embeddings, each (n_i, d); n_i may be 0
+    """
+    queries = normalize(query_vectors)
+    answers = normalize(answer_vectors)
+    batch, dim = queries.shape
+
+    counts = np.array([len(c) for c in context_vectors], dtype=np.int64)
+    similarity = np.einsum("ij,ij->i", queries, answers)
+
+    if counts.sum() == 0:
+        empty = [np.zeros(0, dtype=np.float32) for _ in range(batch)]
+        return BatchScores(similarity, np.zeros(batch, dtype=np.float32), empty)
+
+    contexts = np.concatenate(
+        [np.asarray(c, dtype=np.float32).reshape(-1, dim) for c in context_vectors]
+    )
+    owners = np.repeat(np.arange(batch), counts)
+
+    # Mean chunk vector per triple, then cosine against that triple's answer
+    sums = np.zeros((batch, dim), dtype=np.float32)
+    np.add.at(sums, owners, contexts)
+    means = sums / np.maximum(counts, 1)[:, None]
+    faithfulness = np.einsum("ij,ij->i", normalize(means), answers)
+    faithfulness[counts == 0] = 0.0
+
+    relevance = np.einsum("ij,ij->i", normalize(contexts), queries[owners])
+    chunk_relevance = np.split(relevance, np.cumsum(counts)[:-1])
+
+    return BatchScores(similarity, faithfulness, chunk_relevance)
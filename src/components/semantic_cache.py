@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from src.common.logger import get_logger
+from src.components.manifest import read_index_version
+from src.components.scoring import normalize
+from src.config.config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+)
+
+logger = get_logger(__name__)
+
+
+class SemanticCache:
+    """
+    In-memory cache of answers keyed by query embedding.
+
+    A lookup returns the stored value of the most similar past query when its
+    cosine similarity is at least `threshold`, so paraphrases of a question
+    share one LLM call. Entries expire after `ttl_seconds`, the least recently
+    used entry is evicted beyond `max_entries`, and everything is dropped when
+    `version_fn()` (e.g. the vector index version) changes.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 2048,
+        version_fn: Optional[Callable[[], Any]] = None,
+        version_check_interval: float = 1.0,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._lock = threading.Lock()
+        # key -> (slot, query, value, created_at); order is recency
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._slot_keys = np.full(max_entries, -1, dtype=np.int64)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._next_key = 0
+        self._version = version_fn() if version_fn else None
+        self._version_checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self) -> None:
+        if self.version_fn is None:
+            return
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._clear()
+            logger.info("♻️ Semantic cache invalidated: vector index changed.")
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._slot_keys[:] = -1
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self.invalidations += 1
+
+    def _drop(self, key: int) -> None:
+        slot = self._entries.pop(key)[0]
+        self._slot_keys[slot] = -1
+        self._free_slots.append(slot)
+
+    def lookup(self, query_vector) -> Optional[Any]:
+        """
+        Returns the cached value for the closest past query above the threshold, or None.
+        """
+        query = normalize(query_vector).reshape(-1)
+        with self._lock:
+            self._check_version()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            scores = self._matrix @ query
+            scores[self._slot_keys < 0] = -np.inf
+            slot = int(np.argmax(scores))
+            key = int(self._slot_keys[slot])
+            if scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            _, cached_query, value, created_at = self._entries[key]
+            if time.time() - created_at > self.ttl_seconds:
+                self._drop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            logger.info(f"⚡ Semantic cache hit ({scores[slot]:.3f}) for cached query: {cached_query}")
+            return value
+
+    def store(self, query: str, query_vector, value: Any) -> None:
+        vector = normalize(query_vector).reshape(-1)
+        with self._lock:
+            self._check_version()
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            if not self._free_slots:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            key = self._next_key
+            self._next_key += 1
+            self._matrix[slot] = vector
+            self._slot_keys[slot] = key
+            self._entries[key] = (slot, query, value, time.time())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache(index_name: str = "test-txt-chatbot1") -> Optional[SemanticCache]:
+    """
+    Returns the process-wide answer cache for `index_name`, or None when disabled.
+    """
+    global _semantic_cache
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache(
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                ttl_seconds=SEMANTIC_CACHE_TTL,
+                max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                version_fn=lambda: read_index_version(index_name),
+            )
+    return _semantic_cache
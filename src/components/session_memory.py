@@ -0,0 +1,219 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+from src.common.logger import get_logger
+from src.components.summary_memory import RollingSummaryHistory
+from src.config.config import (
+    SESSION_MAX_SESSIONS,
+    SESSION_IDLE_TTL,
+    SESSION_MAX_MESSAGES,
+    SESSION_DIR,
+    MEMORY_MODE,
+    MEMORY_KEEP_TURNS,
+    MEMORY_RECENT_MAX_TOKENS,
+    MEMORY_SUMMARY_MAX_TOKENS,
+)
+
+logger = get_logger(__name__)
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    return bool(_SESSION_ID.match(session_id or ""))
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+class BoundedChatMessageHistory(InMemoryChatMessageHistory):
+    """
+    Chat history that keeps only the most recent `max_messages` messages.
+    """
+
+    max_messages: int = 30
+
+    def add_message(self, message: BaseMessage) -> None:
+        super().add_message(message)
+        if len(self.messages) > self.max_messages:
+            del self.messages[:-self.max_messages]
+
+
+class ConversationMemory:
+    """
+    The part of langchain's ConversationBufferMemory(return_messages=True) the
+    app uses (`chat_memory` and `buffer`), without importing langchain.memory,
+    which pulls in transformers and torch.
+    """
+
+    def __init__(self, chat_memory: BaseChatMessageHistory):
+        self.chat_memory = chat_memory
+
+    @property
+    def buffer(self) -> List[BaseMessage]:
+        return self.chat_memory.messages
+
+
+def build_memory(max_messages: int = SESSION_MAX_MESSAGES) -> ConversationMemory:
+    """
+    Conversation memory in the configured MEMORY_MODE ("summary" or "buffer").
+    """
+    if MEMORY_MODE == "summary":
+        history = RollingSummaryHistory(
+            keep_turns=MEMORY_KEEP_TURNS,
+            recent_max_tokens=MEMORY_RECENT_MAX_TOKENS,
+            summary_max_tokens=MEMORY_SUMMARY_MAX_TOKENS,
+        )
+    else:
+        history = BoundedChatMessageHistory(max_messages=max_messages)
+    return ConversationMemory(history)
+
+
+class SessionState:
+    """
+    Everything the API remembers about one client: its conversation memory and
+    the last retrieved answer and sources.
+    """
+
+    def __init__(self, max_messages: int = 30):
+        self.memory = build_memory(max_messages)
+        self.retrieved_answer: Optional[str] = None
+        self.retrieved_sources: List[Dict[str, str]] = []
+        self.last_used = time.time()
+
+    def to_dict(self) -> dict:
+        history = self.memory.chat_memory
+        return {
+            "summary": getattr(history, "summary", ""),
+            "messages": messages_to_dict(getattr(history, "verbatim_messages", history.messages)),
+            "retrieved_answer": self.retrieved_answer,
+            "retrieved_sources": self.retrieved_sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_messages: int = 30) -> "SessionState":
+        state = cls(max_messages)
+        if hasattr(state.memory.chat_memory, "summary"):
+            state.memory.chat_memory.summary = data.get("summary", "")
+        state.memory.chat_memory.add_messages(messages_from_dict(data.get("messages", [])))
+        state.retrieved_answer = data.get("retrieved_answer")
+        state.retrieved_sources = data.get("retrieved_sources", [])
+        return state
+
+
+class SessionStore:
+    """
+    Session-keyed conversation state with bounded memory per process.
+
+    At most `max_sessions` sessions are held in memory. The least recently
+    used one is evicted beyond that, and sessions idle for `idle_ttl` seconds
+    are dropped. With `backend_dir` set, sessions are also written there as
+    JSON, so an evicted session is reloaded on its next request.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl: float = 1800,
+        max_messages: int = 30,
+        backend_dir: Optional[str] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_messages
+        self.backend_dir = backend_dir or None
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.backend_dir:
+            os.makedirs(self.backend_dir, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.backend_dir, f"{session_id}.json")
+
+    def _load(self, session_id: str) -> SessionState:
+        if self.backend_dir and os.path.exists(self._path(session_id)):
+            try:
+                with open(self._path(session_id), "r", encoding="utf-8") as f:
+                    return SessionState.from_dict(json.load(f), self.max_messages)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load session '{session_id}', starting fresh: {e}")
+        return SessionState(self.max_messages)
+
+    def _expire(self, now: float) -> None:
+        # Oldest first, so stop at the first session that is still fresh
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_used <= self.idle_ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+
+    def get(self, session_id: str) -> SessionState:
+        """
+        Returns the state for `session_id`, creating or reloading it if needed.
+        """
+        now = time.time()
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._load(session_id)
+                self._sessions[session_id] = state
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_used = now
+            self._expire(now)
+        return state
+
+    def save(self, session_id: str) -> None:
+        """
+        Writes the session to the on-disk backend, if one is configured.
+        """
+        if not self.backend_dir:
+            return
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return
+            data = state.to_dict()
+        tmp_path = f"{self._path(session_id)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path(session_id))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.backend_dir and os.path.exists(self._path(session_id)):
+            os.remove(self._path(session_id))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Returns the process-wide session store configured from SESSION_* settings.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(
+                max_sessions=SESSION_MAX_SESSIONS,
+                idle_ttl=SESSION_IDLE_TTL,
+                max_messages=SESSION_MAX_MESSAGES,
+                backend_dir=SESSION_DIR,
+            )
+    return _store
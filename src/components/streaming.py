@@ -0,0 +1,70 @@
+import queue
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Groups `items` into lists of at most `size`, consuming them lazily.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def threaded(items: Iterable[T], maxsize: int = 4) -> Iterator[T]:
+    """
+    Produces `items` on a background thread and hands them over a bounded queue.
+
+    The producer blocks once `maxsize` items are waiting, so a slow consumer
+    throttles every stage upstream of it (backpressure) and memory stays bounded.
+    Errors raised by the producer are re-raised in the consumer.
+    """
+    handoff: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            put(_DONE)
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Unblocks the producer if the consumer stopped early
+        stop.set()
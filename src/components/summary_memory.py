@@ -0,0 +1,144 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, get_buffer_string
+
+from src.common.logger import get_logger
+from src.components.llm_provider import get_chat_model
+from src.components.tokens import count_tokens, truncate_to_tokens
+
+logger = get_logger(__name__)
+
+# Summaries are folded off the request path; each history folds serially
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+
+
+def format_source_refs(sources: List[Dict[str, str]]) -> str:
+    """
+    Compact reference to the sources of an answer, stored in memory instead of the excerpts.
+    """
+    refs = ", ".join(f"{s.get('source', 'unknown')} p.{s.get('page', 'N/A')}" for s in sources)
+    return f"Sources: {refs}" if refs else "Sources: none"
+
+
+def summarize_turns(summary: str, messages: List[BaseMessage], max_tokens: int) -> str:
+    """
+    Folds `messages` into the running `summary` with one LLM call.
+    """
+    response = get_chat_model("tools").invoke([
+        {
+            "role": "system",
+            "content": (
+                "You maintain a running summary of a legal research conversation. "
+                "Extend the summary with the new lines, keeping case names, statutes, "
+                "parties and open questions. Return only the summary, under "
+                f"{int(max_tokens * 0.75)} words."
+            )
+        },
+        {
+            "role": "user",
+            "content": f"Current summary:\n{summary or '(empty)'}\n\nNew lines:\n{get_buffer_string(messages)}"
+        }
+    ])
+    return response.content if hasattr(response, "content") else response
+
+
+class RollingSummaryHistory(BaseChatMessageHistory):
+    """
+    Chat history that keeps the last `keep_turns` turns verbatim and folds
+    older turns into a rolling summary of at most `summary_max_tokens`.
+
+    A turn starts at a user message. Turns also leave the verbatim window when
+    it exceeds `recent_max_tokens`, so one huge answer can't blow the budget.
+    Folding runs in a background thread; until it finishes, the turns being
+    folded are still returned verbatim, so nothing is lost in between.
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = 3,
+        recent_max_tokens: int = 1500,
+        summary_max_tokens: int = 300,
+        summarize_fn: Optional[Callable[[str, List[BaseMessage], int], str]] = None,
+    ):
+        self.keep_turns = keep_turns
+        self.recent_max_tokens = recent_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summarize_fn = summarize_fn or summarize_turns
+
+        self.summary = ""
+        self._pending: List[BaseMessage] = []
+        self._recent: List[BaseMessage] = []
+        self._recent_tokens = 0
+        self._folding = False
+        self._generation = 0  # bumped by clear(), so an in-flight fold discards its result
+        self._lock = threading.Lock()
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        with self._lock:
+            summary = self.summary
+            verbatim = self._pending + self._recent
+        if summary:
+            return [SystemMessage(content=f"Summary of the earlier conversation: {summary}")] + verbatim
+        return verbatim
+
+    @property
+    def verbatim_messages(self) -> List[BaseMessage]:
+        with self._lock:
+            return self._pending + self._recent
+
+    def add_message(self, message: BaseMessage) -> None:
+        with self._lock:
+            self._recent.append(message)
+            self._recent_tokens += count_tokens(get_buffer_string([message]))
+            if isinstance(message, HumanMessage):
+                self._trim()
+            if self._pending and not self._folding:
+                self._folding = True
+                _executor.submit(self._fold)
+
+    def _turn_starts(self) -> List[int]:
+        return [i for i, m in enumerate(self._recent) if isinstance(m, HumanMessage)]
+
+    def _trim(self) -> None:
+        # Move whole turns from the front of the window to the fold queue, keeping the newest turn
+        starts = self._turn_starts()
+        while len(starts) > 1 and (len(starts) > self.keep_turns or self._recent_tokens > self.recent_max_tokens):
+            turn, self._recent = self._recent[:starts[1]], self._recent[starts[1]:]
+            self._pending.extend(turn)
+            self._recent_tokens -= count_tokens(get_buffer_string(turn))
+            starts = self._turn_starts()
+
+    def _fold(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._folding = False
+                    return
+                batch = list(self._pending)
+                summary = self.summary
+                generation = self._generation
+
+            try:
+                new_summary = self.summarize_fn(summary, batch, self.summary_max_tokens)
+            except Exception as e:
+                # Keep memory bounded even when the LLM is unavailable
+                logger.warning(f"⚠️ Memory summarization failed, truncating instead: {e}")
+                new_summary = f"{summary}\n{get_buffer_string(batch)}".strip()
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self.summary = truncate_to_tokens(new_summary.strip(), self.summary_max_tokens)
+                del self._pending[:len(batch)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.summary = ""
+            self._pending = []
+            self._recent = []
+            self._recent_tokens = 0
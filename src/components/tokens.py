@@ -0,0 +1,41 @@
+from functools import lru_cache
+
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    tiktoken's cl100k_base when it is available (it ships with langchain-openai),
+    otherwise None and token counts are estimated from characters.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken unavailable, estimating token counts from characters: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate LLM token count of `text`, used for prompt and memory budgets.
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for English prose
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts `text` to at most `max_tokens` tokens, keeping the beginning.
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        ids = encoding.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else encoding.decode(ids[:max_tokens])
+    return text[:max_tokens * 4]
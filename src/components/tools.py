@@ -1,20 +1,18 @@
+from typing import AsyncIterator, Iterator
+
 from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from src.components.llm_instance import llm
+from src.components.llm_provider import get_chat_model
 
-def summarizer_fn(text: str) -> str:
-    response = llm.invoke([
+
+def _summarizer_messages(text: str) -> list:
+    return [
         {"role": "system", "content": "You are a helpful assistant that summarizes legal content with point like Case name ,Case Number,Court and bench,Legal issues,Judges,Judgment summary,source reference pdf."},
         {"role": "user", "content": f"Summarize this:\n{text}"}
-    ])
-    return response.content if hasattr(response, "content") else response
+    ]
 
 
-def legal_drafting_fn(instruction: str) -> str:
-    """
-    Drafts legal documents based on the given instruction and context.
-    """
-    response = llm.invoke([
+def _drafting_messages(instruction: str) -> list:
+    return [
         {
             "role": "system",
             "content": (
@@ -34,20 +32,76 @@ def legal_drafting_fn(instruction: str) -> str:
             "role": "user",
             "content": f"Draft the following legal document:\n\n{instruction}"
         }
-    ])
+    ]
 
+
+def summarizer_fn(text: str) -> str:
+    response = get_chat_model("tools").invoke(_summarizer_messages(text))
     return response.content if hasattr(response, "content") else response
 
 
+async def asummarizer_fn(text: str) -> str:
+    response = await get_chat_model("tools").ainvoke(_summarizer_messages(text))
+    return response.content if hasattr(response, "content") else response
+
+
+def legal_drafting_fn(instruction: str) -> str:
+    """
+    Drafts legal documents based on the given instruction and context.
+    """
+    response = get_chat_model("tools").invoke(_drafting_messages(instruction))
+    return response.content if hasattr(response, "content") else response
+
+
+async def alegal_drafting_fn(instruction: str) -> str:
+    """
+    Async version of `legal_drafting_fn` for the API.
+    """
+    response = await get_chat_model("tools").ainvoke(_drafting_messages(instruction))
+    return response.content if hasattr(response, "content") else response
+
+
+def stream_summarizer_fn(text: str) -> Iterator[str]:
+    """
+    Yields the summary token by token as the LLM produces it.
+    """
+    for chunk in get_chat_model("tools").stream(_summarizer_messages(text)):
+        if chunk.content:
+            yield chunk.content
+
+
+async def astream_summarizer_fn(text: str) -> AsyncIterator[str]:
+    async for chunk in get_chat_model("tools").astream(_summarizer_messages(text)):
+        if chunk.content:
+            yield chunk.content
+
+
+def stream_legal_drafting_fn(instruction: str) -> Iterator[str]:
+    """
+    Yields the draft token by token as the LLM produces it.
+    """
+    for chunk in get_chat_model("tools").stream(_drafting_messages(instruction)):
+        if chunk.content:
+            yield chunk.content
+
+
+async def astream_legal_drafting_fn(instruction: str) -> AsyncIterator[str]:
+    async for chunk in get_chat_model("tools").astream(_drafting_messages(instruction)):
+        if chunk.content:
+            yield chunk.content
+
+
 summarizer_tool = Tool.from_function(
     name="Summarizer",
     description="Use this tool to summarize any text input.",
-    func=summarizer_fn
+    func=summarizer_fn,
+    coroutine=asummarizer_fn
 )
 
 
 legal_drafting_tool = Tool.from_function(
     name="LegalDrafting",
     description="Drafts formal legal documents such as notices, petitions, agreements, and affidavits.",
-    func=legal_drafting_fn
+    func=legal_drafting_fn,
+    coroutine=alegal_drafting_fn
 )
\ No newline at end of file
@@ -1,18 +1,61 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 from dotenv import load_dotenv
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
-from langchain.schema import Document
+from langchain_core.documents import Document
 from langchain_community.embeddings import OpenAIEmbeddings
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
-from langchain.embeddings import HuggingFaceEmbeddings
+from src.components.embeddings import get_embedding_model
+from src.components.lexical_index import BM25Index, reciprocal_rank_fusion
+from src.components.local_vector_store import LocalVectorStore
+from src.config.config import (
+    VECTOR_BACKEND, LOCAL_INDEX_DIR, LOCAL_SEARCH_MODE, LOCAL_NPROBE, LOCAL_COMPRESSION, LOCAL_RERANK,
+    HYBRID_FETCH_K, RRF_K,
+)
 import os
 import sys
+import uuid
 
 logger = get_logger(__name__)
 
 
+def ensure_pinecone_index(
+    index_name: str = "test-txt-chatbot1",
+    dimension: int = 384,
+    metric: str = "cosine",
+    cloud: str = "aws",
+    region: str = "us-east-1",
+) -> None:
+    """
+    Creates the Pinecone index if it doesn't exist yet.
+    """
+    load_dotenv()
+
+    PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+    hf_token = os.getenv("hf_token")
+
+    if not PINECONE_API_KEY:
+        raise ValueError("PINECONE_API_KEY is missing from environment variables.")
+
+    os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
+    os.environ["hf_token"] = hf_token or ""
+
+    # Initialize Pinecone client
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+
+    # Create index if it doesn't exist
+    if not pc.has_index(index_name):
+        pc.create_index(
+            name=index_name,
+            dimension=dimension,
+            metric=metric,
+            spec=ServerlessSpec(cloud=cloud, region=region)
+        )
+        logger.info(f"✅ Created Pinecone index '{index_name}'.")
+
+
 def store_documents_in_pinecone(
     texts_chunk: List[Document],
     embedding,
@@ -26,29 +69,7 @@ def store_documents_in_pinecone(
     Stores chunked documents into a Pinecone vector store with batching to avoid payload size limits.
     """
     try:
-        load_dotenv()
-
-        PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-        hf_token = os.getenv("hf_token")
-
-        if not PINECONE_API_KEY:
-            raise ValueError("PINECONE_API_KEY is missing from environment variables.")
-        
-        os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
-        os.environ["hf_token"] = hf_token or ""
-
-        # Initialize Pinecone client
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-
-        # Create index if it doesn't exist
-        if not pc.has_index(index_name):
-            pc.create_index(
-                name=index_name,
-                dimension=dimension,
-                metric=metric,
-                spec=ServerlessSpec(cloud=cloud, region=region)
-            )
-            logger.info(f"✅ Created Pinecone index '{index_name}'.")
+        ensure_pinecone_index(index_name, dimension, metric, cloud, region)
 
         # Helper: batching iterator
         def batch_iter(data, size=50):  # use small batches to stay under 4MB
@@ -80,7 +101,7 @@ def store_documents_in_pinecone(
 
 def load_existing_docsearch(index_name: str = "test-txt-chatbot1") -> PineconeVectorStore:
     """
-    Loads an existing Pinecone index using OpenAI embeddings.
+    Loads an existing Pinecone index using the shared sentence-transformers embeddings.
     """
     try:
         load_dotenv()
@@ -94,7 +115,7 @@ def load_existing_docsearch(index_name: str = "test-txt-chatbot1") -> PineconeVe
         # os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
         os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
 
-        embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        embedding = get_embedding_model()
 
         logger.info(f"Loading Pinecone index '{index_name}'...")
         docsearch = PineconeVectorStore.from_existing_index(index_name=index_name, embedding=embedding)
@@ -104,3 +125,294 @@ def load_existing_docsearch(index_name: str = "test-txt-chatbot1") -> PineconeVe
     except Exception as e:
         logger.error(f"❌ Error loading Pinecone index: {e}")
         raise CustomException(f"Error loading Pinecone index: {e}")
+
+
+def load_local_docsearch(index_name: str = "test-txt-chatbot1", embedding=None) -> LocalVectorStore:
+    """
+    Opens (or creates) the on-disk vector index for `index_name`.
+    """
+    try:
+        index_dir = os.path.join(LOCAL_INDEX_DIR, index_name)
+        return LocalVectorStore(
+            index_dir=index_dir,
+            embedding=embedding or get_embedding_model(),
+            search_mode=LOCAL_SEARCH_MODE,
+            nprobe=LOCAL_NPROBE,
+            compression=LOCAL_COMPRESSION,
+            rerank=LOCAL_RERANK,
+        )
+    except Exception as e:
+        logger.error(f"❌ Error loading local vector index: {e}")
+        raise CustomException(f"Error loading local vector index: {e}")
+
+
+def store_documents_locally(
+    texts_chunk: List[Document],
+    embedding,
+    index_name: str = "test-txt-chatbot1",
+    batch_size: int = 256,
+):
+    """
+    Embeds and appends chunked documents to the on-disk vector index in batches.
+    """
+    try:
+        docsearch = load_local_docsearch(index_name, embedding)
+        total_uploaded = 0
+        for i in range(0, len(texts_chunk), batch_size):
+            batch = texts_chunk[i:i + batch_size]
+            docsearch.add_documents(batch)
+            total_uploaded += len(batch)
+            logger.info(f"✅ Stored batch of {len(batch)} documents (Total stored: {total_uploaded}).")
+
+        logger.info(f"🎉 Successfully stored {total_uploaded} documents in local index '{index_name}'.")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Error storing documents locally: {e}")
+        raise CustomException(f"Failed to store documents in local index: {e}")
+
+
+def load_vector_store(index_name: str = "test-txt-chatbot1"):
+    """
+    Loads the vector store for the backend selected by VECTOR_BACKEND.
+    """
+    if VECTOR_BACKEND == "local":
+        return load_local_docsearch(index_name)
+    return load_existing_docsearch(index_name)
+
+
+def store_documents(texts_chunk: List[Document], embedding, index_name: str = "test-txt-chatbot1"):
+    """
+    Stores chunked documents in the backend selected by VECTOR_BACKEND.
+    """
+    if VECTOR_BACKEND == "local":
+        return store_documents_locally(texts_chunk, embedding, index_name)
+    return store_documents_in_pinecone(texts_chunk, embedding, index_name)
+
+
+def open_vector_store(index_name: str = "test-txt-chatbot1"):
+    """
+    Opens the configured vector store for writing, creating the Pinecone index if needed.
+    """
+    if VECTOR_BACKEND != "local":
+        ensure_pinecone_index(index_name)
+    return load_vector_store(index_name)
+
+
+def upsert_embeddings(
+    docsearch,
+    docs: List[Document],
+    vectors: List[List[float]],
+    ids: Optional[List[str]] = None,
+    batch_size: int = 50,
+) -> List[str]:
+    """
+    Writes already-embedded chunks to the vector store, without embedding them again.
+    """
+    ids = ids or [str(uuid.uuid4()) for _ in docs]
+    try:
+        if isinstance(docsearch, LocalVectorStore):
+            return docsearch.add_embeddings(
+                [doc.page_content for doc in docs],
+                vectors,
+                metadatas=[doc.metadata for doc in docs],
+                ids=ids,
+            )
+
+        records = [
+            {
+                "id": doc_id,
+                "values": list(map(float, vector)),
+                "metadata": {**doc.metadata, docsearch._text_key: doc.page_content},
+            }
+            for doc_id, doc, vector in zip(ids, docs, vectors)
+        ]
+        # Small batches stay under Pinecone's 4MB request limit
+        for i in range(0, len(records), batch_size):
+            docsearch.index.upsert(vectors=records[i:i + batch_size], namespace=docsearch._namespace)
+        return ids
+
+    except Exception as e:
+        logger.error(f"❌ Error upserting embeddings: {e}")
+        raise CustomException(f"Error upserting embeddings: {e}")
+
+
+def delete_from_store(docsearch, ids: List[str], batch_size: int = 1000) -> None:
+    """
+    Deletes chunks by id from either backend.
+    """
+    try:
+        for i in range(0, len(ids), batch_size):
+            docsearch.delete(ids=ids[i:i + batch_size])
+    except Exception as e:
+        logger.error(f"❌ Error deleting chunks: {e}")
+        raise CustomException(f"Error deleting chunks: {e}")
+
+
+def fetch_with_vectors(docsearch, ids: List[str]) -> Tuple[List[Document], List[List[float]]]:
+    """
+    Reads chunks and their stored vectors by id from either backend.
+    Ids that aren't in the store are skipped.
+    """
+    if isinstance(docsearch, LocalVectorStore):
+        return docsearch.get_with_vectors(ids)
+
+    try:
+        found = docsearch.index.fetch(ids=ids, namespace=docsearch._namespace).vectors
+        docs, doc_vectors = [], []
+        for doc_id in ids:
+            record = found.get(doc_id)
+            if record is None:
+                continue
+            metadata = dict(record.metadata or {})
+            text = metadata.pop(docsearch._text_key, None)
+            if text is None:
+                continue
+            docs.append(Document(id=doc_id, page_content=text, metadata=metadata))
+            doc_vectors.append(record.values)
+        return docs, doc_vectors
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching chunks from Pinecone: {e}")
+        raise CustomException(f"Error fetching chunks from Pinecone: {e}")
+
+
+def sync_lexical_index(docsearch, lexical_index: BM25Index) -> None:
+    """
+    Brings the BM25 index in line with a local vector store written without it
+    (e.g. through `add_texts`). Pinecone indexes are kept in sync by the
+    ingestion pipeline instead, since listing them isn't cheap.
+    """
+    if not isinstance(docsearch, LocalVectorStore):
+        return
+    store_ids = docsearch.ids()
+    missing = [doc_id for doc_id in store_ids if doc_id not in lexical_index]
+    stale = set(lexical_index.ids()).difference(store_ids)
+    if stale:
+        lexical_index.delete(stale)
+    for i in range(0, len(missing), 1000):
+        docs = docsearch.get_by_ids(missing[i:i + 1000])
+        lexical_index.add([doc.id for doc in docs], [doc.page_content for doc in docs])
+    if missing or stale:
+        logger.info(f"Synced BM25 index: {len(missing)} chunks added, {len(stale)} removed.")
+
+
+def hybrid_search_with_vectors(
+    docsearch,
+    lexical_index: BM25Index,
+    query: str,
+    k: int = 5,
+    query_vector: Optional[List[float]] = None,
+    fetch_k: int = HYBRID_FETCH_K,
+    rrf_k: int = RRF_K,
+) -> Tuple[List[Document], List[float], List[List[float]]]:
+    """
+    Dense + BM25 search fused with reciprocal rank fusion, with the same
+    contract as `similarity_search_with_vectors`.
+
+    The best `fetch_k` hits of each are fused and the top `k` kept. Dense hits
+    already carry their vectors; chunks found only by BM25 are read back by id
+    in one call.
+    """
+    fetch_k = max(k, fetch_k)
+    docs, query_vector, doc_vectors = _dense_search(docsearch, query, fetch_k, query_vector)
+    lexical_ids, _ = lexical_index.search(query, fetch_k)
+    if not lexical_ids:
+        return docs[:k], query_vector, doc_vectors[:k]
+
+    fused = [doc_id for doc_id, _ in reciprocal_rank_fusion([[doc.id for doc in docs], lexical_ids], k=rrf_k)[:k]]
+    found = {doc.id: (doc, vector) for doc, vector in zip(docs, doc_vectors)}
+    missing = [doc_id for doc_id in fused if doc_id not in found]
+    if missing:
+        found.update((doc.id, (doc, vector)) for doc, vector in zip(*fetch_with_vectors(docsearch, missing)))
+
+    # Ids deleted from the store but not yet from the BM25 index are dropped here
+    hits = [found[doc_id] for doc_id in fused if doc_id in found]
+    return [doc for doc, _ in hits], query_vector, [vector for _, vector in hits]
+
+
+def similarity_search_with_vectors(
+    docsearch,
+    query: str,
+    k: int = 5,
+    query_vector: Optional[List[float]] = None,
+    lexical_index: Optional[BM25Index] = None,
+) -> Tuple[List[Document], List[float], List[List[float]]]:
+    """
+    Runs a similarity search and also returns the query vector and the stored vectors
+    of the matched documents, so callers can score without re-embedding.
+    Pass `query_vector` when the query has already been embedded, and
+    `lexical_index` to fuse in BM25 results (see `hybrid_search_with_vectors`).
+
+    Returns:
+        docs: Matched Document objects, best first
+        query_vector: Embedding of the query
+        doc_vectors: Stored embedding of each matched document
+    """
+    if lexical_index is not None and len(lexical_index):
+        return hybrid_search_with_vectors(docsearch, lexical_index, query, k=k, query_vector=query_vector)
+    return _dense_search(docsearch, query, k, query_vector)
+
+
+def _dense_search(
+    docsearch,
+    query: str,
+    k: int,
+    query_vector: Optional[List[float]],
+) -> Tuple[List[Document], List[float], List[List[float]]]:
+    if isinstance(docsearch, LocalVectorStore):
+        return docsearch.similarity_search_with_vectors(query, k=k, query_vector=query_vector)
+
+    try:
+        if query_vector is None:
+            query_vector = docsearch.embeddings.embed_query(query)
+
+        results = docsearch.index.query(
+            vector=query_vector,
+            top_k=k,
+            include_values=True,
+            include_metadata=True,
+            namespace=docsearch._namespace,
+        )
+
+        docs, doc_vectors = [], []
+        for match in results["matches"]:
+            metadata = dict(match["metadata"] or {})
+            text = metadata.pop(docsearch._text_key, None)
+            if text is None:
+                logger.warning(f"⚠️ Match {match['id']} has no text in its metadata. Skipping.")
+                continue
+            docs.append(Document(id=match["id"], page_content=text, metadata=metadata))
+            doc_vectors.append(match["values"])
+
+        return docs, query_vector, doc_vectors
+
+    except Exception as e:
+        logger.error(f"❌ Error searching Pinecone index: {e}")
+        raise CustomException(f"Error searching Pinecone index: {e}")
+
+
+def batch_similarity_search_with_vectors(
+    docsearch,
+    queries: List[str],
+    query_vectors: List[List[float]],
+    k: int = 5,
+    max_workers: int = 8,
+    lexical_index: Optional[BM25Index] = None,
+) -> List[Union[Tuple[List[Document], List[float], List[List[float]]], Exception]]:
+    """
+    Runs `similarity_search_with_vectors` for many pre-embedded queries at once.
+    Pinecone queries go out concurrently; a failed search is returned as its
+    exception in that query's slot instead of failing the whole batch.
+    """
+    def search(args):
+        query, query_vector = args
+        try:
+            return similarity_search_with_vectors(
+                docsearch, query, k=k, query_vector=query_vector, lexical_index=lexical_index
+            )
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as pool:
+        return list(pool.map(search, zip(queries, query_vectors)))
@@ -1,4 +1,101 @@
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-filepath = os.path.join(BASE_DIR, "research","combined_output2.txt")
\ No newline at end of file
+filepath = os.path.join(BASE_DIR, "research","combined_output2.txt")
+
+# Embedding model shared by ingestion, vector search and answer scoring
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+# On-disk embedding cache (SQLite); set EMBEDDING_CACHE_PATH="" to disable
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, "embedding_cache.sqlite"))
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+
+# Vector store backend: "pinecone" (hosted) or "local" (memory-mapped files on disk)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(BASE_DIR, "vector_index"))
+# Local search: "exact" brute force or "ivf" approximate; nprobe = inverted lists scanned per query
+LOCAL_SEARCH_MODE = os.getenv("LOCAL_SEARCH_MODE", "exact")
+LOCAL_NPROBE = int(os.getenv("LOCAL_NPROBE", "8"))
+# Local compression: "none", "int8" (scalar) or "pq" (product quantization, 48 bytes per 384-d vector);
+# the best LOCAL_RERANK compressed candidates are re-scored exactly (0 disables)
+LOCAL_COMPRESSION = os.getenv("LOCAL_COMPRESSION", "none")
+LOCAL_RERANK = int(os.getenv("LOCAL_RERANK", "50"))
+
+# Retrieval: "hybrid" fuses dense search with a BM25 index (LEXICAL_INDEX_DIR) by reciprocal rank
+# fusion over the best HYBRID_FETCH_K hits of each; "dense" uses the vector store alone
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join(BASE_DIR, "lexical_index"))
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Ingestion compacts the BM25 index once this fraction of its rows are deleted (re-indexed chunks)
+LEXICAL_COMPACT_RATIO = float(os.getenv("LEXICAL_COMPACT_RATIO", "0.2"))
+
+# Two-stage retrieval: over-fetch RERANK_FETCH_K candidates, re-score them with a local cross-encoder
+# on CPU in batches of RERANK_BATCH_SIZE and keep the best RERANK_TOP_K. If scoring would take longer
+# than RERANK_BUDGET_MS the first-stage order is kept.
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", "50"))
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "3"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "512"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "300"))
+
+# Context packing: merge overlapping chunks of one source, drop chunks within CONTEXT_DEDUP_THRESHOLD
+# cosine similarity of a more relevant one, and fill at most CONTEXT_MAX_TOKENS by relevance
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "true").lower() == "true"
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.95"))
+
+# Ingestion: chunks per embed/upsert batch, and embedding processes (1 = embed in-process)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", str(os.cpu_count() or 1)))
+# Threads that run query/answer embeddings for the async API so they don't block the event loop
+EMBED_EXECUTOR_THREADS = int(os.getenv("EMBED_EXECUTOR_THREADS", "4"))
+# Chunking: "judgment" splits on the sections and numbered paragraphs of judgments,
+# "recursive" at fixed character offsets
+CHUNKER = os.getenv("CHUNKER", "judgment")
+# Per-index manifests of file and chunk hashes used for incremental re-indexing
+MANIFEST_DIR = os.getenv("MANIFEST_DIR", os.path.join(BASE_DIR, "manifests"))
+
+# Semantic answer cache: reuse an answer when a new query is this similar to a cached one
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2048"))
+
+# API sessions: held in memory up to SESSION_MAX_SESSIONS (LRU), dropped after SESSION_IDLE_TTL
+# seconds idle; each keeps its last SESSION_MAX_MESSAGES messages. SESSION_DIR="" keeps them in memory only.
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "30"))
+SESSION_DIR = os.getenv("SESSION_DIR", "")
+
+# Conversation memory: "buffer" keeps the last SESSION_MAX_MESSAGES messages; "summary" keeps the
+# last MEMORY_KEEP_TURNS turns (within MEMORY_RECENT_MAX_TOKENS) verbatim and folds older turns
+# into a rolling summary of at most MEMORY_SUMMARY_MAX_TOKENS
+MEMORY_MODE = os.getenv("MEMORY_MODE", "summary")
+MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "3"))
+MEMORY_RECENT_MAX_TOKENS = int(os.getenv("MEMORY_RECENT_MAX_TOKENS", "1500"))
+MEMORY_SUMMARY_MAX_TOKENS = int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", "300"))
+
+# Batch retrieval: most queries per /retrieve/batch request, concurrent LLM calls and vector searches
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "500"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+BATCH_SEARCH_CONCURRENCY = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "8"))
+
+# LLM gateway shared by every Groq client: provider budgets (0 disables a bucket), concurrent calls
+# (halved on 429s, then recovers), retries with jittered backoff, and how long a call may queue
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "512"))
+
+# LLM provider: "groq" (hosted) or "fake" (local deterministic stand-in for load tests)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "Llama3-8b-8192")
+# Fake provider: seconds before the first token, seconds between tokens, words per completion
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+FAKE_LLM_TOKEN_LATENCY = float(os.getenv("FAKE_LLM_TOKEN_LATENCY", "0.02"))
+FAKE_LLM_COMPLETION_WORDS = int(os.getenv("FAKE_LLM_COMPLETION_WORDS", "150"))
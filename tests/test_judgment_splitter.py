@@ -0,0 +1,23 @@
+from langchain_core.documents import Document
+
+from metadata import SAMPLE_JUDGMENT
+from src.components.judgment_splitter import JudgmentSplitter
+
+
+def test_long_first_sentence_keeps_paragraph_number():
+    text = "J U D G M E N T\n1. " + "word " * 300 + "end. Next sentence.\n2. Short paragraph."
+    chunks = JudgmentSplitter(chunk_size=1000, chunk_overlap=200).split_text(text)
+
+    assert chunks[0].startswith("1. word")
+    assert all(len(chunk) >= 250 for chunk in chunks[:-1])
+
+
+def test_sample_judgment_has_no_standalone_preamble():
+    splitter = JudgmentSplitter(chunk_size=1000, chunk_overlap=200)
+    docs = splitter.split_documents([Document(page_content=SAMPLE_JUDGMENT)])
+
+    assert all(len(doc.page_content) >= 250 for doc in docs[:-1])
+    assert "RANJAN GOGOI, J." not in [doc.page_content for doc in docs]
+    author = next(doc for doc in docs if doc.page_content.startswith("RANJAN GOGOI, J."))
+    assert "1. First, the facts" in author.page_content
+    assert author.metadata == {"section": "JUDGMENT", "paragraphs": "1"}